@@ -1,10 +1,20 @@
 # api\app.py
 
-from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
-from fastapi.responses import JSONResponse, HTMLResponse
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import orjson
+from fastapi import FastAPI, UploadFile, File, Form, Request, Response, HTTPException
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 from pathlib import Path
@@ -17,20 +27,57 @@ from src.common.exception.custom_exception import CustomException
 from src.components.document_analysis.document_analysis_pipeline import DocumentAnalysisPipeline
 from src.components.document_comparison.document_comparison_pipeline import DocumentComparisonPipeline
 from src.components.document_qa_chat.document_qa_chat_pipeline import create_document_qa_chat_pipeline
+from src.components.document_qa_chat.document_qa_chat_cache import create_qa_semantic_cache
+from src.configuration.config_loader import config
 
 # Storage / Session managers
 from storage_manager.file_manager import (
     save_uploaded_files,
+    mirror_session_files,
     save_analysis_result,
     save_comparison_result,
-    save_conversation_file,
-    load_conversation_file,
+    append_conversation_turns,
+    conversation_file_path,
+    coalesce_conversation_writes,
+    UploadRejected,
 )
+from storage_manager.session_store import SESSION_TTL_SECONDS, get_session_store
+from storage_manager.result_cache import create_result_cache
 
 # ----------------------------
 # Initialize FastAPI
 # ----------------------------
-app = FastAPI(title="Document Processing API", version="1.0.0")
+async def _load_pipelines(app: FastAPI) -> None:
+    """Build the three pipelines in parallel threads, so startup costs max(t_i) rather than sum(t_i)."""
+    app.state.analysis_pipeline, app.state.comparison_pipeline, app.state.qa_chat_pipeline = await asyncio.gather(
+        asyncio.to_thread(DocumentAnalysisPipeline),
+        asyncio.to_thread(DocumentComparisonPipeline),
+        asyncio.to_thread(create_document_qa_chat_pipeline),
+    )
+    logger.info("All pipelines loaded")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Loading runs in the background so the server starts accepting requests (and /healthz) immediately
+    app.state.pipelines_loaded = asyncio.create_task(_load_pipelines(app))
+    persistence_worker = asyncio.create_task(_persistence_worker())
+    yield
+    app.state.pipelines_loaded.cancel()
+    try:
+        await asyncio.wait_for(persist_queue.join(), timeout=10)  # flush pending result/conversation writes
+    except asyncio.TimeoutError:
+        logger.warning(f"Shutting down with {persist_queue.qsize()} unsaved writes")
+    persistence_worker.cancel()
+    pipeline_executor.shutdown(wait=False, cancel_futures=True)
+    analysis_pipeline = getattr(app.state, "analysis_pipeline", None)
+    if analysis_pipeline is not None:
+        await asyncio.to_thread(analysis_pipeline.close)  # stops its LLM event loop thread
+
+
+app = FastAPI(
+    title="Document Processing API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -41,18 +88,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger bodies (conversation histories, analysis results); streamed responses are compressed on the fly
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Upload limits: requests are refused on Content-Length before the body is parsed, and each file is
+# re-checked while it streams to disk (covers chunked requests that carry no Content-Length)
+MAX_FILE_BYTES = int(config.get("preprocessing.max_file_mb", 50)) << 20
+MAX_REQUEST_BYTES = int(config.get("preprocessing.max_request_mb", 200)) << 20
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if request.method == "POST" and content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+        return _error_response(413, f"Upload exceeds the {MAX_REQUEST_BYTES >> 20} MB request limit")
+    return await call_next(request)
+
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# Pipelines
-analysis_pipeline = DocumentAnalysisPipeline()
-comparison_pipeline = DocumentComparisonPipeline()
-qa_chat_pipeline = create_document_qa_chat_pipeline()
+# The welcome page uses no request context, so render and encode it once instead of on every hit
+_WELCOME_HTML: bytes = templates.get_template("index.html").render(request=None).encode("utf-8")
+
+# Pipelines are loaded at startup into app.state (see lifespan)
+# Result/conversation writes are queued here and drained by a single background worker
+persist_queue: asyncio.Queue = asyncio.Queue()
+PERSIST_BATCH_SIZE = 64
+qa_semantic_cache = create_qa_semantic_cache(config.get("document_qa_chat.semantic_cache", {}))
+
+# Bound concurrent pipeline runs so bursts queue here instead of oversubscribing
+# CPU (analysis/comparison) or the provider's rate limit (QA)
+ANALYSIS_CONCURRENCY = config.get("document_analysis.max_concurrent_requests") or os.cpu_count() or 4
+COMPARISON_CONCURRENCY = config.get("document_comparison.max_concurrent_requests") or os.cpu_count() or 4
+QA_CONCURRENCY = config.get("document_qa_chat.max_concurrent_requests") or 8
+analysis_semaphore = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+comparison_semaphore = asyncio.Semaphore(COMPARISON_CONCURRENCY)
+qa_semaphore = asyncio.Semaphore(QA_CONCURRENCY)
+
+# Pipelines run on their own pool, sized to the semaphores above, so long LLM/OCR calls never
+# starve the default to_thread pool that handles upload writes and cache I/O.
+# (The pipelines hold live model clients and are not picklable, so a process pool is not an option.)
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=ANALYSIS_CONCURRENCY + COMPARISON_CONCURRENCY + QA_CONCURRENCY,
+    thread_name_prefix="pipeline",
+)
 
-# Active sessions per client IP
-user_sessions: dict[str, int] = {}
-conversation_cache: dict[str, list] = {}  # cache per client until END
+# Active sessions per client, keyed on an opaque session cookie (not the IP, which NAT'd clients share).
+# Held in-process or in Redis (SESSION_BACKEND=redis) so that every worker sees the same sessions.
+SESSION_COOKIE = "kk_session"
+# Cookies are HMAC-signed so clients cannot pick another client's id. Set SESSION_SECRET when
+# running several workers; the per-process fallback invalidates cookies on every restart.
+SESSION_SECRET = (os.getenv("SESSION_SECRET") or secrets.token_hex(32)).encode("utf-8")
+session_store = get_session_store(ttl=SESSION_TTL_SECONDS)
+
+# Pipeline results keyed by the content hash of the uploaded files (None when disabled)
+analysis_results = create_result_cache("document_analysis")
+comparison_results = create_result_cache("document_comparison")
 
 # ----------------------------
 # Response Model
@@ -62,16 +153,136 @@ class APIResponse(BaseModel):
     result: Optional[dict] = None
     error: Optional[str] = None
 
+# ----------------------------
+# Helpers
+# ----------------------------
+def _sign(client_id: str) -> str:
+    return hmac.new(SESSION_SECRET, client_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+def _cookie_client_id(request: Request) -> Optional[str]:
+    """Return the session id from a validly signed session cookie, or None."""
+    client_id, _, signature = request.cookies.get(SESSION_COOKIE, "").partition(".")
+    if client_id and hmac.compare_digest(signature, _sign(client_id)):
+        return client_id
+    return None
+
+def _client_id(request: Request) -> str:
+    """Return the caller's session id, or a fresh one when the request carries no valid session cookie."""
+    return _cookie_client_id(request) or secrets.token_urlsafe(16)
+
+def _set_session_cookie(response: Response, client_id: str) -> None:
+    response.set_cookie(
+        SESSION_COOKIE, f"{client_id}.{_sign(client_id)}",
+        max_age=SESSION_TTL_SECONDS, httponly=True, samesite="lax"
+    )
+
+def _api_response(success: bool, result: Optional[dict] = None, error: Optional[str] = None) -> ORJSONResponse:
+    """
+    Encode an APIResponse-shaped body straight from a plain dict. Returning a Response
+    skips FastAPI's response_model validation; APIResponse still documents the schema.
+    """
+    return ORJSONResponse({"success": success, "result": result, "error": error})
+
+def _iter_result_json(result: dict):
+    """
+    Yield an APIResponse-shaped success body as orjson-encoded pieces: one per top-level
+    result field, and one per element for list fields such as conversation_history.
+    The concatenation is a single valid JSON document, so clients still call response.json().
+    """
+    yield b'{"success":true,"error":null,"result":{'
+    for i, (key, value) in enumerate(result.items()):
+        prefix = (b"," if i else b"") + orjson.dumps(key) + b":"
+        if isinstance(value, list):
+            yield prefix + b"["
+            for j, item in enumerate(value):
+                yield (b"," if j else b"") + orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+            yield b"]"
+        else:
+            yield prefix + orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    yield b"}}"
+
+def _streamed_api_response(result: dict) -> StreamingResponse:
+    """Stream a potentially large success body so the first bytes go out before it is fully encoded."""
+    return StreamingResponse(_iter_result_json(result), media_type="application/json")
+
+def _error_response(status_code: int, error: str) -> ORJSONResponse:
+    """Build an error response from a plain dict; validating an outbound payload adds nothing."""
+    return ORJSONResponse(status_code=status_code, content={"success": False, "result": None, "error": error})
+
+def _persist(save_fn, *args) -> None:
+    """Queue a save_* call for the persistence worker; the response never waits on the write."""
+    persist_queue.put_nowait((save_fn, args))
+
+async def _persistence_worker() -> None:
+    """
+    Drain queued writes in batches of up to PERSIST_BATCH_SIZE, running them one at a time
+    (sync ones on a worker thread). Under load, turns queued for the same session are
+    coalesced into a single append. Failures are logged, never surfaced to the client.
+    """
+    while True:
+        jobs = [await persist_queue.get()]
+        while len(jobs) < PERSIST_BATCH_SIZE and not persist_queue.empty():
+            jobs.append(persist_queue.get_nowait())
+        try:
+            for save_fn, args in coalesce_conversation_writes(jobs):
+                try:
+                    if asyncio.iscoroutinefunction(save_fn):
+                        await save_fn(*args)
+                    else:
+                        await asyncio.to_thread(save_fn, *args)
+                except Exception as e:
+                    logger.error(f"Background persistence failed in {save_fn.__name__}: {str(e)}")
+        finally:
+            for _ in jobs:
+                persist_queue.task_done()
+
+class PipelinesUnavailable(Exception):
+    """Pipelines were never scheduled to load (app started without its lifespan); answered with 503."""
+
+
+async def _pipelines_ready() -> None:
+    """Wait for startup loading to finish; re-raises if it failed. Shielded so a cancelled request can't cancel it."""
+    task = getattr(app.state, "pipelines_loaded", None)
+    if task is None:
+        raise PipelinesUnavailable("Pipelines are not loaded")
+    await asyncio.shield(task)
+
+async def _run_pipeline(fn, *args):
+    """Run a blocking pipeline call on the dedicated pipeline pool."""
+    return await asyncio.get_running_loop().run_in_executor(pipeline_executor, partial(fn, *args))
+
+def _content_key(digests) -> str:
+    """Order-independent content key from the per-file hashes computed while saving the upload."""
+    return ":".join(sorted(digests))
+
+def _result_key(pipeline, content_key: str) -> str:
+    """Cache key for a pipeline result: the pipeline's model/prompt/strategy scope plus the upload content."""
+    return f"{pipeline.result_cache_scope}|{content_key}"
+
 # ----------------------------
 # Welcome
 # ----------------------------
 @app.get("/", response_class=HTMLResponse)
-async def welcome(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+async def welcome():
+    # Pre-encoded bytes go out as a single write; no Jinja parse/render or str encode per request
+    return HTMLResponse(_WELCOME_HTML)
+
+@app.get("/healthz", tags=["Welcome"])
+async def healthz():
+    """Readiness: 200 once every pipeline has loaded, 503 while loading or if loading failed."""
+    task = getattr(app.state, "pipelines_loaded", None)
+    if task is None:
+        return ORJSONResponse(status_code=503, content={"status": "not_loaded"})
+    if not task.done():
+        return ORJSONResponse(status_code=503, content={"status": "loading"})
+    if task.cancelled() or task.exception() is not None:
+        error = "cancelled" if task.cancelled() else str(task.exception())
+        return ORJSONResponse(status_code=503, content={"status": "failed", "error": error})
+    return ORJSONResponse({"status": "ok"})
 
 @app.get("/api", response_model=APIResponse, tags=["Welcome"])
 async def api_welcome():
-    return APIResponse(
+    return _api_response(
         success=True,
         result={
             "message": "🚀 Welcome to Document Processing API",
@@ -92,25 +303,46 @@ async def document_analysis(files: List[UploadFile] = File(...)):
         if not files:
             raise HTTPException(status_code=400, detail="No files uploaded")
 
-        session_dir = save_uploaded_files("document_analysis", files)
-        uploaded_files = [f.name for f in session_dir.iterdir() if f.is_file()]
-
-        result = analysis_pipeline.run_analysis([str(f) for f in session_dir.iterdir() if f.is_file()])
+        session_dir, digests = await save_uploaded_files("document_analysis", files, max_bytes=MAX_FILE_BYTES)
+        _persist(mirror_session_files, list(digests))
+        saved_paths = list(digests)
+        uploaded_files = [f.name for f in saved_paths]
+
+        # Byte-identical uploads reuse the earlier analysis (same model and prompts) instead of re-running it
+        await _pipelines_ready()
+        content_key = _result_key(app.state.analysis_pipeline, _content_key(digests.values()))
+        cached = await asyncio.to_thread(analysis_results.get, content_key) if analysis_results else None
+
+        if cached is None:
+            async with analysis_semaphore:
+                result = await _run_pipeline(
+                    app.state.analysis_pipeline.run_analysis, [str(f) for f in saved_paths]
+                )
+            # A result with fallback chunks is degraded; serve it but don't keep it
+            if analysis_results is not None and not result.get("fallback_chunks"):
+                # Embed the bytes the cache just encoded, so the response and the saved result reuse them
+                result = orjson.Fragment(await asyncio.to_thread(analysis_results.put, content_key, result))
+        else:
+            logger.info(f"Reusing cached analysis for identical upload ({content_key})")
+            result = orjson.Fragment(cached)
 
         session_number = int(session_dir.name.split("_")[1])
-        save_analysis_result("document_analysis", session_number, result, uploaded_files)
+        _persist(save_analysis_result, "document_analysis", session_number, result, uploaded_files)
 
-        return APIResponse(success=True, result={
+        return _streamed_api_response({
             "session": str(session_dir),
             "uploaded_files": uploaded_files,
             "analysis": result
         })
+    except UploadRejected as e:
+        logger.warning(f"Upload rejected: {str(e)}")
+        return _error_response(e.status_code, str(e))
+    except PipelinesUnavailable as e:
+        logger.warning(str(e))
+        return _error_response(503, str(e))
     except Exception as e:
         logger.error(f"Document analysis error: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content=APIResponse(success=False, error=str(e)).dict()
-        )
+        return _error_response(500, str(e))
 
 # ----------------------------
 # Document Comparison
@@ -124,44 +356,66 @@ async def document_comparison(
         if not files_a or not files_b:
             raise HTTPException(status_code=400, detail="Both file sets are required")
 
-        session_dir = save_uploaded_files(
-            "document_comparison",
-            files_a + files_b,
-            comparison=True
+        session_dir, digests = await save_uploaded_files(
+            "document_comparison", doc1=files_a, doc2=files_b, max_bytes=MAX_FILE_BYTES
         )
+        _persist(mirror_session_files, list(digests))  # doc1 and doc2 share one parallel upload batch
 
+        # Split the saved paths (and their hashes) back into sides in a single pass
         doc1_dir = session_dir / "doc1"
-        doc2_dir = session_dir / "doc2"
-
-        doc1_files = [f.name for f in doc1_dir.iterdir() if f.is_file()]
-        doc2_files = [f.name for f in doc2_dir.iterdir() if f.is_file()]
-
-        result = comparison_pipeline.run_comparison(
-            [str(f) for f in doc1_dir.iterdir() if f.is_file()],
-            [str(f) for f in doc2_dir.iterdir() if f.is_file()]
-        )
+        doc1_paths, doc2_paths, doc1_digests, doc2_digests = [], [], [], []
+        for path, digest in digests.items():
+            if path.parent == doc1_dir:
+                doc1_paths.append(path)
+                doc1_digests.append(digest)
+            else:
+                doc2_paths.append(path)
+                doc2_digests.append(digest)
+        doc1_files = [f.name for f in doc1_paths]
+        doc2_files = [f.name for f in doc2_paths]
+
+        # Sides stay distinct in the key: swapping doc1/doc2 changes unique_doc1/unique_doc2
+        key_a = _content_key(doc1_digests)
+        key_b = _content_key(doc2_digests)
+        await _pipelines_ready()
+        content_key = _result_key(app.state.comparison_pipeline, f"{key_a}/{key_b}")
+        cached = await asyncio.to_thread(comparison_results.get, content_key) if comparison_results else None
+
+        if cached is None:
+            async with comparison_semaphore:
+                result = await _run_pipeline(
+                    app.state.comparison_pipeline.run_comparison,
+                    [str(f) for f in doc1_paths],
+                    [str(f) for f in doc2_paths]
+                )
+            if comparison_results is not None:
+                # Embed the bytes the cache just encoded, so the response and the saved result reuse them
+                result = orjson.Fragment(await asyncio.to_thread(comparison_results.put, content_key, result))
+        else:
+            logger.info(f"Reusing cached comparison for identical upload ({content_key})")
+            result = orjson.Fragment(cached)
 
         session_number = int(session_dir.name.split("_")[1])
-        save_comparison_result("document_comparison", session_number, result, doc1_files, doc2_files)
+        _persist(save_comparison_result, "document_comparison", session_number, result, doc1_files, doc2_files)
 
-        return APIResponse(success=True, result={
+        return _streamed_api_response({
             "session": str(session_dir),
             "uploaded_files": {"doc1": doc1_files, "doc2": doc2_files},
             "comparison": result
         })
+    except UploadRejected as e:
+        logger.warning(f"Upload rejected: {str(e)}")
+        return _error_response(e.status_code, str(e))
+    except PipelinesUnavailable as e:
+        logger.warning(str(e))
+        return _error_response(503, str(e))
     except Exception as e:
         logger.error(f"Document comparison error: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content=APIResponse(success=False, error=str(e)).dict()
-        )
+        return _error_response(500, str(e))
 
 # ----------------------------
 # Document QA Chat - FIXED
 # ----------------------------
-from pydantic import BaseModel
-from typing import Optional, List
-
 class ChatRequest(BaseModel):
     question: Optional[str] = None
     files: List[str] = []  # This will be handled separately for file uploads
@@ -172,50 +426,63 @@ async def document_qa_chat(
     question: Optional[str] = Form(None),
     files: List[UploadFile] = File(None)
 ):
-    client_id = request.client.host
+    known_client_id = _cookie_client_id(request)
+    client_id = known_client_id or secrets.token_urlsafe(16)
+    response = await _answer_qa_chat(client_id, question, files)
+    if known_client_id is None:
+        _set_session_cookie(response, client_id)
+    return response
+
+async def _answer_qa_chat(
+    client_id: str,
+    question: Optional[str],
+    files: Optional[List[UploadFile]]
+) -> Response:
     logger.info(f"QA Chat request from {client_id}: question={question}, files={files}")
 
     try:
+        await _pipelines_ready()
+
         # -----------------------------------
         # Step 1: Handle new document upload
         # -----------------------------------
         if files and len(files) > 0:
             logger.info(f"Processing file upload: {[f.filename for f in files]}")
             
-            # Check if user already has an active session
-            existing_session = user_sessions.get(client_id)
-            if existing_session is not None:
-                # Save existing conversation before starting new session
-                old_history = conversation_cache.pop(client_id, [])
-                if old_history:
-                    save_conversation_file("document_qa_chat", existing_session, old_history)
+            # End any active session; its turns were already appended to disk as they happened
+            old_session, _ = await session_store.pop(client_id)
+            if qa_semantic_cache is not None and old_session is not None:
+                qa_semantic_cache.clear(old_session)
 
             # Create a new session for this document upload
-            session_dir = save_uploaded_files("document_qa_chat", files)
+            session_dir, digests = await save_uploaded_files("document_qa_chat", files, max_bytes=MAX_FILE_BYTES)
+            _persist(mirror_session_files, list(digests))
             session_number = int(session_dir.name.split("_")[1])
-            user_sessions[client_id] = session_number
 
-            uploaded_doc_paths = [str(f) for f in session_dir.iterdir() if f.is_file()]
+            uploaded_doc_paths = [str(f) for f in digests]
             uploaded_files_names = [Path(f).name for f in uploaded_doc_paths]
 
             # Ingest the new documents
-            qa_chat_pipeline.ingest_new_documents(uploaded_doc_paths)
+            async with qa_semaphore:
+                await _run_pipeline(app.state.qa_chat_pipeline.ingest_new_documents, uploaded_doc_paths)
 
             # Initialize conversation cache for this session
-            conversation_cache[client_id] = [{
+            history = [{
                 "timestamp": datetime.utcnow().isoformat(),
                 "type": "document_upload",
                 "uploaded_files": uploaded_files_names,
                 "message": "Documents uploaded successfully"
             }]
+            await session_store.set(client_id, session_number, history)
+            _persist(append_conversation_turns, "document_qa_chat", session_number, history)
 
-            return APIResponse(
+            return _api_response(
                 success=True,
                 result={
                     "session": session_number,
                     "uploaded_files": uploaded_files_names,
                     "message": "Documents uploaded and session started",
-                    "conversation_history": conversation_cache[client_id]
+                    "conversation_history": history
                 }
             )
 
@@ -223,45 +490,53 @@ async def document_qa_chat(
         # Step 2: Handle question query
         # -----------------------------------
         if not question:
-            return JSONResponse(
-                status_code=422,
-                content=APIResponse(success=False, error="Question is required when no files are provided").dict()
-            )
+            return _error_response(422, "Question is required when no files are provided")
 
-        session_number = user_sessions.get(client_id)
+        session_number, _ = await session_store.get(client_id)
         if session_number is None:
-            return JSONResponse(
-                status_code=400,
-                content=APIResponse(success=False, error="Please upload documents first.").dict()
-            )
-
-        # Query the pipeline
-        result = qa_chat_pipeline.query(question)
-        answer = result.get("answer", "I'm sorry, I couldn't process your question.")
-
-        # Append to conversation cache
-        conversation_cache.setdefault(client_id, []).append({
+            return _error_response(400, "Please upload documents first.")
+
+        # Serve verbatim repeats, then paraphrases, from the semantic cache; otherwise query the pipeline
+        answer = None
+        if qa_semantic_cache is not None:
+            answer = qa_semantic_cache.lookup_exact(session_number, question)
+            if answer is None:
+                async with qa_semaphore:
+                    question_vector = await _run_pipeline(app.state.qa_chat_pipeline.embed_question, question)
+                answer = qa_semantic_cache.lookup(session_number, question_vector)
+
+        if answer is None:
+            async with qa_semaphore:
+                result = await _run_pipeline(app.state.qa_chat_pipeline.query, question)
+            answer = result.get("answer", "I'm sorry, I couldn't process your question.")
+            if qa_semantic_cache is not None and result.get("success"):
+                qa_semantic_cache.add(session_number, question, question_vector, answer)
+
+        # Append to the conversation (this also slides the session's TTL) and to the session's log on disk
+        turn = {
             # "timestamp": datetime.utcnow().isoformat(),
             # "type": "qa",
             "question": question,
             "answer": answer
-        })
+        }
+        history = await session_store.append(client_id, session_number, turn)
+        _persist(append_conversation_turns, "document_qa_chat", session_number, [turn])
 
-        return APIResponse(
-            success=True,
-            result={
-                "session": session_number,
-                "latest_answer": answer,
-                "conversation_history": conversation_cache[client_id]
-            }
-        )
+        return _streamed_api_response({
+            "session": session_number,
+            "latest_answer": answer,
+            "conversation_history": history
+        })
 
+    except UploadRejected as e:
+        logger.warning(f"Upload rejected: {str(e)}")
+        return _error_response(e.status_code, str(e))
+    except PipelinesUnavailable as e:
+        logger.warning(str(e))
+        return _error_response(503, str(e))
     except Exception as e:
         logger.error(f"QA chat error: {str(e)}", exc_info=True)
-        return JSONResponse(
-            status_code=500,
-            content=APIResponse(success=False, error=f"Internal server error: {str(e)}").dict()
-        )
+        return _error_response(500, f"Internal server error: {str(e)}")
 
 # ----------------------------
 # Get Current Chat Session - FIXED
@@ -269,49 +544,43 @@ async def document_qa_chat(
 @app.get("/document_qa_chat/session", response_model=APIResponse, tags=["Document QA Chat"])
 async def get_current_session(request: Request):
     """Get current active session and conversation history"""
-    client_id = request.client.host
-    session_number = user_sessions.get(client_id)
+    client_id = _client_id(request)
+    session_number, history = await session_store.get(client_id)
     
     if session_number is None:
-        return APIResponse(
+        return _api_response(
             success=False, 
             error="No active session",
             result={"session": None, "conversation_history": []}
         )
     
-    history = conversation_cache.get(client_id, [])
-    
-    return APIResponse(
-        success=True,
-        result={
-            "session": session_number,
-            "conversation_history": history
-        }
-    )
+    return _streamed_api_response({
+        "session": session_number,
+        "conversation_history": history
+    })
 
 # ----------------------------
 # End QA Chat - FIXED
 # ----------------------------
 @app.post("/document_qa_chat/end", response_model=APIResponse, tags=["Document QA Chat"])
 async def end_chat(request: Request):
-    client_id = request.client.host
-    session_number = user_sessions.pop(client_id, None)
+    client_id = _client_id(request)
+    session_number, history = await session_store.pop(client_id)
 
     if session_number is None:
-        return APIResponse(success=False, error="No active session to end")
+        return _api_response(success=False, error="No active session to end")
 
-    history = conversation_cache.pop(client_id, [])
+    # Every turn is already in the session's conversations.jsonl; copy the finished log to the storage backend
     if history:
-        save_conversation_file("document_qa_chat", session_number, history)
+        _persist(mirror_session_files, [conversation_file_path("document_qa_chat", session_number)])
+    if qa_semantic_cache is not None:
+        qa_semantic_cache.clear(session_number)
 
-    return APIResponse(
-        success=True,
-        result={
-            "message": "Chat session ended and conversation saved",
-            "session": session_number,
-            "conversation_history": history
-        }
-    )
+    return _streamed_api_response({
+        "message": "Chat session ended and conversation saved",
+        "session": session_number,
+        "conversation_history": history
+    })
 
 # ----------------------------
 # Clear Chat Session (for testing) - FIXED
@@ -319,11 +588,12 @@ async def end_chat(request: Request):
 @app.post("/document_qa_chat/clear", response_model=APIResponse, tags=["Document QA Chat"])
 async def clear_chat_session(request: Request):
     """Clear current chat session"""
-    client_id = request.client.host
-    session_number = user_sessions.pop(client_id, None)
-    conversation_cache.pop(client_id, None)
+    client_id = _client_id(request)
+    session_number, _ = await session_store.pop(client_id)
+    if qa_semantic_cache is not None and session_number is not None:
+        qa_semantic_cache.clear(session_number)
     
-    return APIResponse(
+    return _api_response(
         success=True,
         result={
             "message": "Chat session cleared",
@@ -3,17 +3,20 @@
 
 import argparse
 from typing import Dict
-from src.components.document_comparison.document_comparison_pipeline import DocumentComparisonPipeline
 from src.common.logging.logger import logger
 from src.common.exception.custom_exception import CustomException
-from src.configuration.config_loader import config
 
 
 def parse_args() -> argparse.Namespace:
-    """Parse CLI arguments for overriding input directories."""
+    """Parse CLI arguments for overriding input directories and the comparison strategy."""
     parser = argparse.ArgumentParser(description="Run Document Comparison Workflow")
     parser.add_argument("--dir_a", type=str, help="Path to first comparison directory")
     parser.add_argument("--dir_b", type=str, help="Path to second comparison directory")
+    parser.add_argument(
+        "--strategy",
+        type=str,
+        help="Document comparison strategy (compare_docs/holistic_compare); defaults to config",
+    )
     return parser.parse_args()
 
 
@@ -23,6 +26,11 @@ def main():
         logger.info("🚀 Starting Document Comparison Workflow")
 
         args = parse_args()
+
+        # Heavy imports (config + langchain pipeline) only after argument parsing, so --help stays fast
+        from src.configuration.config_loader import config
+        from src.components.document_comparison.document_comparison_pipeline import DocumentComparisonPipeline
+
         paths: Dict[str, str] = config.get_comparison_paths()
 
         # Allow CLI override
@@ -32,7 +40,9 @@ def main():
         logger.info(f"Using input directories:\n - A: {input_dir_a}\n - B: {input_dir_b}")
 
         # Initialize pipeline
-        pipeline = DocumentComparisonPipeline()
+        if args.strategy and args.strategy not in config.get_document_comparison_strategies():
+            raise CustomException(f"Unknown strategy: {args.strategy}", ValueError("invalid_strategy"))
+        pipeline = DocumentComparisonPipeline(strategy=args.strategy)
 
         # Run workflow
         result = pipeline.run_comparison([input_dir_a], [input_dir_b])
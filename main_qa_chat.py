@@ -1,5 +1,6 @@
 # main_qa_chat.py
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -7,7 +8,6 @@ from pathlib import Path
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.components.document_qa_chat.document_qa_chat_pipeline import create_document_qa_chat_pipeline
 from src.common.logging.logger import logger
 
 
@@ -18,6 +18,9 @@ def main():
     print("=" * 50)
     
     try:
+        # Imported here so the langchain stack loads only when the demo actually runs
+        from src.components.document_qa_chat.document_qa_chat_pipeline import create_document_qa_chat_pipeline
+
         # Create the pipeline
         pipeline = create_document_qa_chat_pipeline()
         
@@ -31,13 +34,13 @@ def main():
             "How does anxiety affect thinking patterns?"
         ]
         
-        for i, question in enumerate(sample_questions, 1):
+        # Query the pipeline: the questions are independent, so they run concurrently
+        results = asyncio.run(pipeline.aquery_many(sample_questions))
+        
+        for i, (question, result) in enumerate(zip(sample_questions, results), 1):
             print(f"\n💬 Question {i}: {question}")
             print("-" * 40)
             
-            # Query the pipeline
-            result = pipeline.query(question)
-            
             if result['success']:
                 print(f"🤖 Answer: {result['answer']}")
                 print(f"📊 Retrieved {result['retrieved_docs_count']} relevant documents")
@@ -2,7 +2,16 @@ import os
 import sys
 import logging
 from typing import Optional, Any, Dict, Tuple
-from src.common.logging.logger import logger
+from src.common.logging.logger import logger, cached_basename
+
+# Read once at import rather than on every raise; call reload_env() after changing it (e.g. in tests)
+LOG_FULL_TRACEBACK = os.getenv("LOG_FULL_TRACEBACK", "0") == "1"
+
+
+def reload_env() -> None:
+    """Re-read LOG_FULL_TRACEBACK from the environment."""
+    global LOG_FULL_TRACEBACK
+    LOG_FULL_TRACEBACK = os.getenv("LOG_FULL_TRACEBACK", "0") == "1"
 
 
 class CustomException(Exception):
@@ -27,12 +36,16 @@ class CustomException(Exception):
         self.root_cause = self.exc_type.__name__ if self.exc_type else "UnknownError"
         self.cause_message = str(self.exc_value) if self.exc_value else None
 
-        # Get error location
-        self.file_name, self.lineno, self.func_name = self._get_error_location(self.exc_tb)
+        # Get error location: the innermost traceback frame, or for a direct raise (no traceback
+        # yet) simply the frame constructing the exception, with no walk or try/except needed
+        if self.exc_tb is not None:
+            self.file_name, self.lineno, self.func_name = self._get_error_location(self.exc_tb)
+        else:
+            caller = sys._getframe(1)
+            self.file_name, self.lineno, self.func_name = caller.f_code.co_filename, caller.f_lineno, caller.f_code.co_name
 
         # Traceback handling
-        trace_env = os.getenv("LOG_FULL_TRACEBACK", "0") == "1"
-        include_full = include_traceback if include_traceback is not None else trace_env
+        include_full = include_traceback if include_traceback is not None else LOG_FULL_TRACEBACK
         self.traceback = self._format_traceback(self.exc_tb) if include_full and self.exc_tb else None
 
         # Log only once
@@ -52,14 +65,6 @@ class CustomException(Exception):
 
     def _get_error_location(self, exc_tb):
         """Return filename, lineno, func_name for the error location."""
-        if not exc_tb:
-            # Try to get current frame if no traceback
-            try:
-                frame = sys._getframe(2)  # Skip exception init frames
-                return frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name
-            except:
-                return "<unknown>", -1, "<unknown>"
-        
         # Get the frame where the error actually occurred
         tb = exc_tb
         while tb.tb_next:
@@ -76,7 +81,7 @@ class CustomException(Exception):
         while tb and len(frames) < max_frames:
             f = tb.tb_frame
             frames.append({
-                "file": os.path.basename(f.f_code.co_filename),  # Just filename, not full path
+                "file": cached_basename(f.f_code.co_filename),  # Just filename, not full path
                 "line": tb.tb_lineno,
                 "function": f.f_code.co_name
             })
@@ -86,35 +91,33 @@ class CustomException(Exception):
 
     def _log_exception(self):
         """Emit a single clean structured log entry."""
-        # Base payload - use 'event' for the main message
+        # One payload dict, context merged in the literal (it may override the base fields, as before)
         payload = {
             'event': self.error_message,
             'error_type': self.root_cause,
-            'location': f"{os.path.basename(self.file_name)}:{self.lineno}:{self.func_name}",
+            'location': f"{cached_basename(self.file_name)}:{self.lineno}:{self.func_name}",
+            **self.context,
         }
 
-        # Add context if available
-        if self.context:
-            payload.update(self.context)  # Merge context into main payload
-        
         # Add cause if different from main message
         if self.cause_message and self.cause_message != self.error_message:
             payload['cause'] = self.cause_message
-        
+
         # Add traceback only if explicitly enabled
         if self.traceback:
             payload['traceback'] = self.traceback
 
-        # Log at appropriate level
+        # Log once at the appropriate level
         if self.log_level >= logging.ERROR:
-            logger.error(**payload)
+            emit = logger.error
         elif self.log_level >= logging.WARNING:
-            logger.warning(**payload)
+            emit = logger.warning
         else:
-            logger.info(**payload)
+            emit = logger.info
+        emit(**payload)
 
     def __str__(self):
-        return f"{self.error_message} ({self.root_cause}) at {os.path.basename(self.file_name)}:{self.lineno}"
+        return f"{self.error_message} ({self.root_cause}) at {cached_basename(self.file_name)}:{self.lineno}"
 
     def __repr__(self):
         return f"CustomException({self.root_cause}: {self.error_message})"
\ No newline at end of file
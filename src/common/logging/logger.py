@@ -1,19 +1,90 @@
 # src\common\logging\logger.py
 
+import atexit
 import os
+import queue
 import sys
 import logging
 import re
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from functools import lru_cache
 from typing import Optional
+import orjson
 import structlog
 
 # NOTE:
 # - LOG_CONSOLE_DEV=1 => pretty console renderer (dev)
 # - LOG_JSON=0 => disable JSON renderer (not recommended for prod)
+# - LOG_ASYNC=1 => write log records from a background thread instead of the calling one
 LOG_CONSOLE_DEV = os.getenv("LOG_CONSOLE_DEV", "0") == "1"
 LOG_JSON = os.getenv("LOG_JSON", "1") != "0"
+LOG_ASYNC = os.getenv("LOG_ASYNC", "0") == "1"
+
+
+@lru_cache(maxsize=2048)
+def cached_basename(path: str) -> str:
+    """os.path.basename for source paths; frames come from a small set of files, so results are memoized."""
+    return os.path.basename(path)
+
+
+# Leading keys of every JSON log line, in order; any other keys follow in insertion order
+_KEY_ORDER = (
+    "timestamp",
+    "level",
+    "event",
+    "error_type",
+    "file",
+    "function",
+    "line",
+    "message",
+    "context",
+    "traceback",
+)
+_KEY_RANK = {k: i for i, k in enumerate(_KEY_ORDER)}
+_UNRANKED = len(_KEY_ORDER)
+
+
+def _key_rank(key: str) -> int:
+    return _KEY_RANK.get(key, _UNRANKED)
+
+
+# Built once rather than per error/warning call. This module is skipped when looking for the
+# callsite, so the reported frame is the code that logged, not the processor below.
+_CALLSITE_ADDER = structlog.processors.CallsiteParameterAdder(
+    parameters=[
+        structlog.processors.CallsiteParameter.FILENAME,
+        structlog.processors.CallsiteParameter.FUNC_NAME,
+        structlog.processors.CallsiteParameter.LINENO,
+    ],
+    additional_ignores=[__name__],
+)
+
+
+_SEPARATOR = "=" * 80
+
+
+@lru_cache(maxsize=256)
+def get_structured_logger(name: str) -> structlog.BoundLogger:
+    """structlog.get_logger, memoized per name so repeated lookups reuse one logger proxy."""
+    return structlog.get_logger(name)
+
+
+def _orjson_dumps(obj, default=None, **_):
+    """JSON serializer for structlog's JSONRenderer; orjson is several times faster than json.dumps."""
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _maybe_format_exc_info(logger, method_name, event_dict):
+    """format_exc_info, entered only for the rare events that carry exc_info."""
+    if "exc_info" in event_dict:
+        return structlog.processors.format_exc_info(logger, method_name, event_dict)
+    return event_dict
+
+
+# Literal substrings, one of which every sensitive pattern below contains (the patterns are case-sensitive);
+# a string with none of them cannot match, so it skips the regex entirely
+_SENSITIVE_NEEDLES = ("key", "KEY", "TOKEN", "S3_BUCKET", "secret", "token", "password")
 
 
 class SensitiveDataProcessor:
@@ -41,11 +112,15 @@ class SensitiveDataProcessor:
         ]
         
         # Keys to mask in event_dict (structlog context)
-        self.sensitive_keys = {
+        self.sensitive_keys = frozenset({
             'api_key', 'api_secret', 'secret', 'token', 'password', 'key',
             'mistral_api_key', 'openai_api_key', 'groq_api_key', 
             'pinecone_api_key', 'huggingfacehub_api_token', 'google_api_key'
-        }
+        })
+
+        # One precompiled alternation: a single scan per string instead of one re.sub per pattern
+        self._combined = re.compile("|".join(f"(?:{p})" for p in self.sensitive_patterns))
+        self._quoted_re = re.compile(r'[\'"][^\'"]+[\'"]')
     
     def __call__(self, logger, method_name, event_dict):
         # Mask sensitive values in the event message
@@ -53,41 +128,50 @@ class SensitiveDataProcessor:
             event_dict['event'] = self._mask_sensitive_string(str(event_dict['event']))
         
         # Mask sensitive keys in the event_dict context
-        for key in list(event_dict.keys()):
+        for key, value in event_dict.items():
             if key in self.sensitive_keys:
                 event_dict[key] = '[MASKED]'
-            elif isinstance(event_dict[key], str):
-                event_dict[key] = self._mask_sensitive_string(event_dict[key])
-            elif isinstance(event_dict[key], dict):
-                event_dict[key] = self._mask_sensitive_dict(event_dict[key])
+            elif isinstance(value, str):
+                event_dict[key] = self._mask_sensitive_string(value)
+            elif isinstance(value, dict):
+                event_dict[key] = self._mask_sensitive_dict(value)
         
         return event_dict
-    
+
     def _mask_sensitive_string(self, text):
         """Mask sensitive data in string messages"""
-        for pattern in self.sensitive_patterns:
-            text = re.sub(pattern, self._mask_replacement, text)
-        return text
+        if not self._may_be_sensitive(text):
+            return text
+        return self._combined.sub(self._mask_replacement, text)
+
+    @staticmethod
+    def _may_be_sensitive(text):
+        """Cheap substring prefilter: every pattern contains one of _SENSITIVE_NEEDLES"""
+        return any(needle in text for needle in _SENSITIVE_NEEDLES)
     
     def _mask_sensitive_dict(self, obj):
-        """Recursively mask sensitive data in dictionaries"""
+        """Build a masked copy of nested dicts/lists in one stack-based pass (no recursion, no pre-scan)"""
         if not isinstance(obj, dict):
             return obj
-            
+
         masked = {}
-        for key, value in obj.items():
-            if key in self.sensitive_keys:
-                masked[key] = '[MASKED]'
-            elif isinstance(value, str):
-                masked[key] = self._mask_sensitive_string(value)
-            elif isinstance(value, dict):
-                masked[key] = self._mask_sensitive_dict(value)
-            elif isinstance(value, list):
-                masked[key] = [self._mask_sensitive_dict(item) if isinstance(item, dict) 
-                              else self._mask_sensitive_string(item) if isinstance(item, str) 
-                              else item for item in value]
-            else:
-                masked[key] = value
+        stack = [(obj, masked)]
+        while stack:
+            src, dst = stack.pop()
+            is_dict = isinstance(src, dict)
+            for key, value in (src.items() if is_dict else enumerate(src)):
+                if is_dict and key in self.sensitive_keys:
+                    dst[key] = '[MASKED]'
+                elif isinstance(value, str):
+                    dst[key] = self._mask_sensitive_string(value)
+                elif isinstance(value, dict):
+                    dst[key] = {}
+                    stack.append((value, dst[key]))
+                elif isinstance(value, list):
+                    dst[key] = [None] * len(value)
+                    stack.append((value, dst[key]))
+                else:
+                    dst[key] = value
         return masked
     
     def _mask_replacement(self, match):
@@ -107,14 +191,61 @@ class SensitiveDataProcessor:
         
         # For other patterns, show key exists but mask everything else
         if any(keyword in matched_text.lower() for keyword in ['api_key', 'secret', 'token', 'password']):
-            return re.sub(r'[\'"][^\'"]+[\'"]', "'[MASKED]'", matched_text)
+            return self._quoted_re.sub("'[MASKED]'", matched_text)
         
         return '[MASKED]'
 
 
+class BufferedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    TimedRotatingFileHandler that writes through a 64 KiB buffer instead of flushing every record.
+    The buffer is flushed every `flush_every` records, on warnings/errors, on close, and by a
+    background timer every `flush_interval` seconds so a quiet log still reaches disk.
+    """
+
+    def __init__(self, *args, flush_every: int = 64, flush_interval: float = 1.0, **kwargs):
+        self.flush_every = flush_every
+        self._pending = 0
+        super().__init__(*args, **kwargs)
+        self._stop = threading.Event()
+        threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True).start()
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=1 << 16, encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if self._pending >= self.flush_every or record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        # The handler's RLock guards _pending: emit() already holds it (via handle()), the timer does not
+        with self.lock:
+            super().flush()
+            self._pending = 0
+
+    def _flush_periodically(self, interval: float):
+        while not self._stop.wait(interval):
+            with self.lock:
+                if self._pending:
+                    self.flush()
+
+    def close(self):
+        self._stop.set()
+        super().close()
+
+
 class CustomLogger:
     """
-    Structured JSON logger using structlog + rotating file handler.
+    Structured JSON logger using structlog + a file handler that rotates at midnight (UTC).
 
     Dev tips:
       - set LOG_CONSOLE_DEV=1 to get pretty console output during development
@@ -127,20 +258,16 @@ class CustomLogger:
         self,
         log_dir: str = "logs",
         log_level: int = logging.INFO,
-        max_bytes: int = 10_000_000,
         backup_count: int = 5,
     ):
         self.logs_dir = os.path.join(os.getcwd(), log_dir)
-        os.makedirs(self.logs_dir, exist_ok=True)
-
-        self.log_file_path = os.path.join(
-            self.logs_dir, f"{datetime.now().strftime('%Y%m%d')}.log"
-        )
+        # Current day's log; at midnight it is renamed to app.log.YYYY-MM-DD and a new one started
+        self.log_file_path = os.path.join(self.logs_dir, "app.log")
         self.log_level = log_level
-        self.max_bytes = max_bytes
         self.backup_count = backup_count
 
         if not CustomLogger._configured:
+            os.makedirs(self.logs_dir, exist_ok=True)
             self._configure_structlog()
             CustomLogger._configured = True
 
@@ -153,12 +280,14 @@ class CustomLogger:
 
         # Avoid duplicate handlers if reconfiguring
         if not root_logger.handlers:
-            # File handler
-            file_handler = RotatingFileHandler(
+            # File handler (buffered when a background listener does the writing)
+            file_handler_class = BufferedTimedRotatingFileHandler if LOG_ASYNC else TimedRotatingFileHandler
+            file_handler = file_handler_class(
                 self.log_file_path,
-                maxBytes=self.max_bytes,
+                when="midnight",
                 backupCount=self.backup_count,
                 encoding="utf-8",
+                utc=True,
             )
             file_handler.setLevel(self.log_level)
 
@@ -167,26 +296,22 @@ class CustomLogger:
             console_handler.setLevel(self.log_level)
 
             # Attach handlers
-            root_logger.addHandler(file_handler)
-            root_logger.addHandler(console_handler)
+            if LOG_ASYNC:
+                # Callers only enqueue the record; a listener thread does the file/console writes
+                # (and any rotation), and is flushed at interpreter exit
+                log_queue = queue.SimpleQueue()
+                root_logger.addHandler(QueueHandler(log_queue))
+                listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+                listener.start()
+                atexit.register(listener.stop)
+            else:
+                root_logger.addHandler(file_handler)
+                root_logger.addHandler(console_handler)
 
         # --- Custom key ordering for JSON logs ---
         def key_order_processor(logger, method_name, event_dict):
-            key_order = [
-                "timestamp",
-                "level",
-                "event",
-                "error_type",
-                "file",
-                "function",
-                "line",
-                "message",
-                "context",
-                "traceback",
-            ]
-            ordered = {k: event_dict[k] for k in key_order if k in event_dict}
-            ordered.update({k: v for k, v in event_dict.items() if k not in ordered})
-            return ordered
+            # One C-level sort on a precomputed rank; unranked keys keep their order after the ranked ones
+            return {k: event_dict[k] for k in sorted(event_dict, key=_key_rank)}
 
         # --- Pre-chain processors ---
         pre_chain = [
@@ -196,26 +321,16 @@ class CustomLogger:
 
         # --- Conditional callsite enrichment ---
         def conditional_callsite(logger, method_name, event_dict):
-            if method_name in ["error", "warning"]:
-                callsite_adder = structlog.processors.CallsiteParameterAdder(
-                    parameters=[
-                        structlog.processors.CallsiteParameter.FILENAME,
-                        structlog.processors.CallsiteParameter.FUNC_NAME,
-                        structlog.processors.CallsiteParameter.LINENO,
-                    ]
-                )
-                event_dict = callsite_adder(logger, method_name, event_dict)
-
-                if "filename" in event_dict:
-                    event_dict["file"] = os.path.basename(event_dict["filename"])
-                    del event_dict["filename"]
-                if "lineno" in event_dict:
-                    event_dict["line"] = event_dict["lineno"]
-                    del event_dict["lineno"]
-                if "func_name" in event_dict:
-                    event_dict["function"] = event_dict["func_name"]
-                    del event_dict["func_name"]
+            if method_name not in ("error", "warning"):
+                return event_dict
 
+            event_dict = _CALLSITE_ADDER(logger, method_name, event_dict)
+            if "filename" in event_dict:
+                event_dict["file"] = cached_basename(event_dict.pop("filename"))
+            if "lineno" in event_dict:
+                event_dict["line"] = event_dict.pop("lineno")
+            if "func_name" in event_dict:
+                event_dict["function"] = event_dict.pop("func_name")
             return event_dict
 
         # ✅ ADD SENSITIVE DATA PROCESSOR HERE
@@ -225,14 +340,14 @@ class CustomLogger:
         if LOG_CONSOLE_DEV and not LOG_JSON:
             renderer = structlog.dev.ConsoleRenderer()
         else:
-            renderer = structlog.processors.JSONRenderer(sort_keys=False)
+            renderer = structlog.processors.JSONRenderer(serializer=_orjson_dumps)
 
         # --- Structlog config ---
         structlog.configure(
             processors=[
                 structlog.stdlib.filter_by_level,
                 *pre_chain,
-                structlog.processors.format_exc_info,
+                _maybe_format_exc_info,
                 conditional_callsite,
                 sensitive_processor,  # ✅ ADDED: Mask sensitive data before rendering
                 key_order_processor,
@@ -245,13 +360,17 @@ class CustomLogger:
         )
 
     def get_logger(self, name: Optional[str] = None) -> structlog.BoundLogger:
-        return structlog.get_logger(name or __name__)
+        return get_structured_logger(name or __name__)
 
     @staticmethod
     def log_separator():
-        logger = structlog.get_logger("separator")
-        logger.info("=" * 80)
+        get_structured_logger("separator").info(_SEPARATOR)
 
 
-# Global logger instance
-logger = CustomLogger().get_logger(__name__)
\ No newline at end of file
+# Global logger instance, created on first access (PEP 562) so importing this module
+# for its helpers does not create the log directory or configure handlers
+def __getattr__(name):
+    if name == "logger":
+        globals()["logger"] = CustomLogger().get_logger(__name__)
+        return globals()["logger"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
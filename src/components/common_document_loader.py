@@ -1,13 +1,16 @@
 # src/components/common_document_loader.py
 
 from __future__ import annotations
+import csv
+import io
 import os
 import sqlite3
 import importlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Iterable, Dict, Type, Union
 
-import pandas as pd
 from langchain_core.documents import Document
 
 from src.common.logging.logger import logger
@@ -15,6 +18,22 @@ from src.common.exception.custom_exception import CustomException
 from src.utils.common_utils import ensure_dir
 
 
+@lru_cache(maxsize=None)
+def _import_loader(import_path: str) -> Type:
+    """Resolve 'package.module.ClassName' once per process; every later file is a cache hit."""
+    module_path, class_name = import_path.rsplit(".", 1)
+    return getattr(importlib.import_module(module_path), class_name)
+
+
+@lru_cache(maxsize=None)
+def _loader_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Process-wide pool for file parsing, shared by every loader (and both comparison sides).
+    Only leaf load_file calls run on it, so pool tasks never wait on other pool tasks.
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="doc-loader")
+
+
 class CommonDocumentLoader:
     """
     Generic document loader for various projects.
@@ -27,10 +46,12 @@ class CommonDocumentLoader:
         input_dir: str | None = None,
         supported_exts: set[str] | None = None,
         loader_map: Dict[str, str] | None = None,
+        max_workers: int = 8,
     ):
         self.input_dir = ensure_dir(input_dir) if input_dir else None
         self.supported_exts = supported_exts or set()
         self.loader_map = loader_map or {}
+        self.max_workers = max(1, max_workers)
         logger.info(f"CommonDocumentLoader initialized. input_dir={self.input_dir}")
         logger.info(f"Supported file types: {', '.join(sorted(self.supported_exts))}")
 
@@ -46,25 +67,58 @@ class CommonDocumentLoader:
         if not import_path:
             return None
         try:
-            module_path, class_name = import_path.rsplit(".", 1)
-            module = importlib.import_module(module_path)
-            return getattr(module, class_name)
+            return _import_loader(import_path)
         except Exception as e:
             raise CustomException(f"Failed to import loader for extension '{ext}' ({import_path})", e)
 
-    def load_paths(self, paths: Iterable[str | Path]) -> List[Document]:
-        docs: List[Document] = []
-        for p in paths:
-            p = Path(p)
+    def _walk_directory(self, directory: Path) -> List[Path]:
+        """Supported files under a directory, in walk order."""
+        paths: List[Path] = []
+        for root, _, files in os.walk(directory):
+            for f in files:
+                path = Path(root) / f
+                if path.suffix.lower() in self.supported_exts:
+                    paths.append(path)
+                else:
+                    logger.info(f"Skipped unsupported file type: {path}")
+        return paths
+
+    def expand_paths(self, paths: Iterable[str | Path]) -> List[Path]:
+        """Resolve files and directories into the list of files to load; missing paths are skipped."""
+        files: List[Path] = []
+        for p in map(Path, paths):
             try:
                 if p.is_dir():
-                    docs.extend(self.load_directory(p))
+                    files.extend(self._walk_directory(p))
                 elif p.is_file():
-                    docs.extend(self.load_file(p))
+                    files.append(p)
                 else:
                     logger.warning(f"Path not found or unsupported: {p}")
             except Exception as e:
                 logger.error(f"Failed to load path {p}: {e}")
+        return files
+
+    def _load_file_or_skip(self, path: Path) -> List[Document]:
+        try:
+            file_docs = self.load_file(path)
+            logger.info(f"File ingested: {path} (docs: {len(file_docs)})")
+            return file_docs
+        except Exception as e:
+            logger.error(f"File skipped due to error: {path} | {e}")
+            return []
+
+    def submit_files(self, files: List[Path]) -> List[Future]:
+        """Queue files on the shared loader pool (parsers are I/O- and C-extension-bound)."""
+        pool = _loader_executor(self.max_workers)
+        return [pool.submit(self._load_file_or_skip, f) for f in files]
+
+    @staticmethod
+    def gather_files(futures: List[Future]) -> List[Document]:
+        """Collect submitted loads in submission order."""
+        return [doc for future in futures for doc in future.result()]
+
+    def load_paths(self, paths: Iterable[str | Path]) -> List[Document]:
+        docs = self.gather_files(self.submit_files(self.expand_paths(paths)))
         if not docs:
             logger.warning("No supported documents found in the provided paths.")
         return docs
@@ -76,21 +130,8 @@ class CommonDocumentLoader:
             logger.error(msg)
             raise CustomException(msg, FileNotFoundError(directory))
 
-        documents: List[Document] = []
         try:
-            for root, _, files in os.walk(directory):
-                for f in files:
-                    path = Path(root) / f
-                    ext = path.suffix.lower()
-                    if ext not in self.supported_exts:
-                        logger.info(f"Skipped unsupported file type: {path}")
-                        continue
-                    try:
-                        file_docs = self.load_file(path)
-                        documents.extend(file_docs)
-                        logger.info(f"File ingested: {path} (docs: {len(file_docs)})")
-                    except Exception as e:
-                        logger.error(f"File skipped due to error: {path} | {e}")
+            documents = self.gather_files(self.submit_files(self._walk_directory(directory)))
             if not documents:
                 logger.warning(f"No supported documents found in directory: {directory}")
             return documents
@@ -127,30 +168,39 @@ class CommonDocumentLoader:
             d.metadata = {**(d.metadata or {}), "source": source}
         return docs
 
-    def _load_sqlite(self, db_path: str) -> List[Document]:
+    def _load_sqlite(self, db_path: str, batch_size: int = 10_000) -> List[Document]:
+        """One CSV Document per table, streamed with fetchmany so no DataFrame is built."""
         try:
             conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = [row[0] for row in cursor.fetchall()]
-            docs: List[Document] = []
-
-            for table in tables:
-                df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-                page_content = df.to_csv(index=False)
-                docs.append(
-                    Document(
-                        page_content=page_content,
-                        metadata={
-                            "source": self._norm_path(db_path),
-                            "table": table,
-                            "rows": len(df),
-                        },
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+                tables = [row[0] for row in cursor.fetchall()]
+                docs: List[Document] = []
+
+                for table in tables:
+                    quoted = table.replace('"', '""')
+                    cursor.execute(f'SELECT * FROM "{quoted}"')
+                    buf = io.StringIO()
+                    writer = csv.writer(buf, lineterminator="\n")
+                    writer.writerow(col[0] for col in cursor.description)
+                    rows = 0
+                    while batch := cursor.fetchmany(batch_size):
+                        writer.writerows(batch)
+                        rows += len(batch)
+                    docs.append(
+                        Document(
+                            page_content=buf.getvalue(),
+                            metadata={
+                                "source": self._norm_path(db_path),
+                                "table": table,
+                                "rows": rows,
+                            },
+                        )
                     )
-                )
-            conn.close()
-            return docs
+                return docs
+            finally:
+                conn.close()
         except Exception as e:
             logger.error(f"Failed to load SQLite DB {db_path}: {e}")
             raise CustomException(f"Failed to load SQLite DB: {db_path}", e)
-
@@ -1,5 +1,7 @@
 # src/components/document_analysis/analysis_parsers.py
 
+from typing import List, Type
+
 from pydantic import BaseModel, Field
 from langchain.output_parsers import OutputFixingParser
 from langchain_core.output_parsers import PydanticOutputParser
@@ -11,13 +13,22 @@ class DocumentAnalysisResult(BaseModel):
     summary: str = Field(..., description="Document summary")
 
 
-def get_document_analysis_parser(llm=None):
+class ChunkSummary(BaseModel):
+    id: int = Field(..., description="Number of the chunk in the prompt, e.g. 2 for [2]")
+    summary: str = Field(..., description="Summary of that chunk")
+
+
+class BatchSummaries(BaseModel):
+    items: List[ChunkSummary] = Field(..., description="One summary per numbered chunk")
+
+
+def get_document_analysis_parser(llm=None, pydantic_object: Type[BaseModel] = DocumentAnalysisResult):
     """
     Return a robust output parser for document analysis.
     If an LLM is provided, wraps the Pydantic parser with OutputFixingParser
     to automatically repair invalid or non-JSON outputs.
     """
-    base_parser = PydanticOutputParser(pydantic_object=DocumentAnalysisResult)
+    base_parser = PydanticOutputParser(pydantic_object=pydantic_object)
 
     if llm is not None:
         return OutputFixingParser.from_llm(parser=base_parser, llm=llm)
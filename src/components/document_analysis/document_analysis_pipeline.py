@@ -1,14 +1,19 @@
  # src/document_analysis/document_analysis_pipeline.py
 
 from __future__ import annotations
+import asyncio
+import hashlib
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Union
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+from typing import List, Dict, Any, Optional, Tuple, Union
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.runnables import RunnableLambda, RunnableSequence
 
 from src.components.document_analysis.document_ingestion_analysis import DocumentAnalysisIngestor
 from src.components.document_analysis.document_preprocessing import DocumentPreprocessingPipeline
-from src.components.document_analysis.analysis_parsers import get_document_analysis_parser
+from src.components.document_analysis.analysis_parsers import BatchSummaries, get_document_analysis_parser
+from src.components.document_analysis.summary_cache import SummaryCache, create_summary_cache
 from src.common.logging.logger import logger
 from src.common.exception.custom_exception import CustomException
 from src.configuration.config_loader import config
@@ -31,6 +36,36 @@ class DocumentAnalysisPipeline:
 
             # ---- Robust parser with OutputFixingParser ----
             self.parser = get_document_analysis_parser(llm=self.llm)
+            self.batch_parser = get_document_analysis_parser(llm=self.llm, pydantic_object=BatchSummaries)
+
+            # ---- Chains, built once per prompt step ----
+            self.chains: Dict[str, RunnableSequence] = {}
+            for step, parser in (
+                ("summary_map", self.parser),
+                ("summary_map_batched", self.batch_parser),
+                ("summary_reduce", self.parser),
+            ):
+                prompt_cfg = prompts.get_analysis_prompt(step)
+                if prompt_cfg:
+                    self.chains[step] = self._build_chain(prompt_cfg, parser)
+
+            # ---- Exact-match cache of chunk summaries ----
+            self.summary_cache = create_summary_cache()
+
+            # ---- Result cache scope: results depend on the model and prompts, not just the uploads ----
+            self.model_id = getattr(self.llm, "model_name", None) or type(self.llm).__name__
+            scope_parts = [self.model_id, str(config.get("document_analysis.marshal_size", 1))]
+            scope_parts += [self._prompt_text(prompts.get_analysis_prompt(step)) for step in sorted(self.chains)]
+            self.result_cache_scope = hashlib.blake2b("\0".join(scope_parts).encode("utf-8"), digest_size=8).hexdigest()
+
+            # ---- Event loop for async LLM calls ----
+            # One long-lived loop, so the LLM's async HTTP client is never reused across loops
+            # and concurrent run_analysis calls from worker threads share it (stopped by close()).
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name="analysis-llm-loop", daemon=True)
+            self._loop_thread.start()
+            # Shared by every step of every run_analysis call, so it caps LLM calls process-wide
+            self._llm_semaphore = asyncio.Semaphore(config.get("document_analysis.concurrency", 8))
 
             logger.info("DocumentAnalysisPipeline initialized successfully.")
 
@@ -38,58 +73,181 @@ class DocumentAnalysisPipeline:
             logger.error(f"Failed to initialize DocumentAnalysisPipeline: {e}")
             raise CustomException("Pipeline initialization failed", e)
 
-    def _build_chain(self, prompt_cfg: Dict[str, Any]) -> RunnableSequence:
-        """Create a runnable chain from a prompt config and LLM."""
+    async def _cancel_pending(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        """Cancel in-flight LLM steps, then stop and close the pipeline's event loop. Safe to call twice."""
+        if self._loop.is_closed():
+            return
         try:
-            prompt = PromptTemplate(
-                input_variables=prompt_cfg["input_variables"],
-                partial_variables={"format_instructions": self.parser.get_format_instructions()},
-                template=prompt_cfg["template"],
-            )
-            return prompt | self.llm | self.parser
+            asyncio.run_coroutine_threadsafe(self._cancel_pending(), self._loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Analysis event loop did not drain cleanly: {e}")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            if not self._loop.is_running():
+                self._loop.close()
+        logger.info("DocumentAnalysisPipeline closed.")
+
+    def _build_chain(self, prompt_cfg: Dict[str, Any], parser=None) -> RunnableSequence:
+        """Create a runnable chain from a prompt config (system/human messages or a single template) and LLM."""
+        parser = parser or self.parser
+        try:
+            format_instructions = parser.get_format_instructions()
+            if "messages" in prompt_cfg:
+                prompt = ChatPromptTemplate.from_messages(
+                    [(msg["role"], msg["content"]) for msg in prompt_cfg["messages"]]
+                ).partial(format_instructions=format_instructions)
+            else:
+                prompt = PromptTemplate(
+                    input_variables=prompt_cfg["input_variables"],
+                    partial_variables={"format_instructions": format_instructions},
+                    template=prompt_cfg["template"],
+                )
+            return prompt | self.llm | RunnableLambda(self._log_cache_usage) | parser
         except Exception as e:
             logger.error(f"Failed to build chain: {e}")
             raise CustomException("Failed to build chain", e)
 
-    def _batch_process(self, texts: List[str], step: str) -> List[str]:
-        """Run a prompt step (summary_map / summary_reduce) across chunks in batches."""
-        results: List[str] = []
+    @staticmethod
+    def _log_cache_usage(message: BaseMessage) -> BaseMessage:
+        """Pass-through step that logs how many prompt tokens the provider served from its prefix cache."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        if cached is not None:
+            logger.debug(f"LLM prompt cache: {cached} of {usage.get('input_tokens')} input tokens cached")
+        return message
 
-        prompt_cfg = prompts.get_analysis_prompt(step)
-        if not prompt_cfg:
+    @staticmethod
+    def _prompt_text(prompt_cfg: Dict[str, Any]) -> str:
+        if "messages" in prompt_cfg:
+            return "\n".join(msg["content"] for msg in prompt_cfg["messages"])
+        return prompt_cfg.get("template", "")
+
+    @staticmethod
+    def _make_input(prompt_cfg: Dict[str, Any], text: str) -> Dict[str, str]:
+        """Map a text onto the prompt's input variables."""
+        input_dict = {}
+        if "document_text" in prompt_cfg["input_variables"]:
+            input_dict["document_text"] = text
+        if "chunk_summaries" in prompt_cfg["input_variables"]:
+            input_dict["chunk_summaries"] = text
+        if "summary" in prompt_cfg["input_variables"]:
+            input_dict["summary"] = ""  # Empty for first pass
+        return input_dict
+
+    async def _abatch_process(self, texts: List[str], step: str) -> List[Optional[str]]:
+        """
+        Run a prompt step (summary_map / summary_reduce) across chunks, up to `concurrency` calls in flight.
+        Failed chunks come back as None; the caller decides on the fallback.
+        """
+        if step not in self.chains:
             raise CustomException(f"Prompt config '{step}' not found", ValueError(step))
 
-        chain = self._build_chain(prompt_cfg)
-        batch_size = config.get("document_analysis.batch_size", 10)  # Added default
-        fallback_len = config.get("document_analysis.chunk_fallback_length", 500)  # Added default
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            
-            # Fix: Create proper input dictionaries based on the prompt's input variables
-            inputs = []
-            for text in batch:
-                input_dict = {}
-                if "document_text" in prompt_cfg["input_variables"]:
-                    input_dict["document_text"] = text
-                if "chunk_summaries" in prompt_cfg["input_variables"]:
-                    input_dict["chunk_summaries"] = text
-                if "summary" in prompt_cfg["input_variables"]:
-                    input_dict["summary"] = ""  # Empty for first pass
-                inputs.append(input_dict)
-
-            try:
-                outputs = chain.batch(inputs)
-                for out in outputs:
-                    results.append(out.dict()["summary"])
-            except Exception as e:
-                logger.warning(f"Step '{step}' failed on batch {i // batch_size}: {e}")
-                for text in batch:
-                    # Simple JSON-safe fallback
-                    results.append(text[:fallback_len])
+        prompt_cfg = prompts.get_analysis_prompt(step)
+        chain = self.chains[step]
+
+        async def run(text: str):
+            async with self._llm_semaphore:
+                return await chain.ainvoke(self._make_input(prompt_cfg, text))
+
+        outputs = await asyncio.gather(*(run(t) for t in texts), return_exceptions=True)
 
+        results: List[Optional[str]] = []
+        for i, out in enumerate(outputs):
+            if isinstance(out, BaseException):
+                if not isinstance(out, Exception):
+                    raise out  # cancellation propagates instead of becoming a fallback
+                logger.warning(f"Step '{step}' failed on chunk {i}: {out}")
+                results.append(None)
+            else:
+                results.append(out.dict()["summary"])
         return results
 
+    async def _amarshaled_map(self, texts: List[str], marshal_size: int) -> List[Optional[str]]:
+        """
+        summary_map with `marshal_size` chunks packed into each prompt as [1] ... [K],
+        parsed back by id; chunks the model skipped (or a failed group) come back as None.
+        """
+        if "summary_map_batched" not in self.chains:
+            raise CustomException("Prompt config 'summary_map_batched' not found", ValueError("summary_map_batched"))
+
+        chain = self.chains["summary_map_batched"]
+        groups = [texts[i : i + marshal_size] for i in range(0, len(texts), marshal_size)]
+
+        async def run(group: List[str]):
+            chunks = "\n\n".join(f"[{n}] {text}" for n, text in enumerate(group, 1))
+            async with self._llm_semaphore:
+                return await chain.ainvoke({"chunks": chunks})
+
+        outputs = await asyncio.gather(*(run(g) for g in groups), return_exceptions=True)
+
+        results: List[Optional[str]] = []
+        for i, (group, out) in enumerate(zip(groups, outputs)):
+            if isinstance(out, BaseException):
+                if not isinstance(out, Exception):
+                    raise out  # cancellation propagates instead of becoming a fallback
+                logger.warning(f"Step 'summary_map_batched' failed on group {i}: {out}")
+                summaries = {}
+            else:
+                summaries = {item.id: item.summary for item in out.items}
+            results.extend(summaries.get(n) or None for n in range(1, len(group) + 1))
+        return results
+
+    async def _amap(self, chunk_texts: List[str]) -> List[Optional[str]]:
+        """summary_map over the chunks; unique chunks missing from the summary cache go to the LLM (None = failed)."""
+        marshal_size = config.get("document_analysis.marshal_size", 1)
+        step = "summary_map_batched" if marshal_size > 1 else "summary_map"
+
+        unique = list(dict.fromkeys(chunk_texts))
+        summaries: Dict[str, Optional[str]] = {}
+        keys: Dict[str, bytes] = {}
+        if self.summary_cache is not None:
+            template = self._prompt_text(prompts.get_analysis_prompt(step) or {})
+            scope = SummaryCache.scope(self.model_id, template)
+            keys = {text: SummaryCache.make_key(scope, text) for text in unique}
+            found = await asyncio.to_thread(self.summary_cache.get_many, list(keys.values()))
+            summaries = {text: found[key] for text, key in keys.items() if key in found}
+
+        misses = [text for text in unique if text not in summaries]
+        logger.info(f"summary_map: {len(chunk_texts) - len(misses)} of {len(chunk_texts)} chunks answered from cache")
+        if misses:
+            if marshal_size > 1:
+                fresh = await self._amarshaled_map(misses, marshal_size)
+            else:
+                fresh = await self._abatch_process(misses, "summary_map")
+            summaries.update(zip(misses, fresh))
+
+            if self.summary_cache is not None:
+                # Only real summaries are cached, never failures
+                await asyncio.to_thread(
+                    self.summary_cache.put_many,
+                    ((keys[t], summary) for t, summary in zip(misses, fresh) if summary is not None),
+                )
+
+        return [summaries[text] for text in chunk_texts]
+
+    async def _amap_reduce(self, chunk_texts: List[str]) -> Tuple[str, int]:
+        """Returns the reduced summary and how many LLM steps fell back to truncated input text."""
+        fallback_len = config.get("document_analysis.chunk_fallback_length", 500)
+        mapped = await self._amap(chunk_texts)
+        fallbacks = sum(summary is None for summary in mapped)
+        # Simple JSON-safe fallback: the start of the chunk itself
+        combined = "\n\n".join(
+            summary if summary is not None else text[:fallback_len] for summary, text in zip(mapped, chunk_texts)
+        )
+
+        reduced = (await self._abatch_process([combined], "summary_reduce"))[0]
+        if reduced is None:
+            fallbacks += 1
+            reduced = combined[:fallback_len]
+        return reduced, fallbacks
+
     def run_analysis(
         self, file_paths: List[Union[str, Path]] | None = None
     ) -> Dict[str, Any]:
@@ -110,16 +268,17 @@ class DocumentAnalysisPipeline:
 
             chunk_texts = [chunk.page_content for chunk in clean_docs]
             logger.info(f"Total chunks to analyze: {len(chunk_texts)}")
+            # The LLM steps only need the texts; drop the raw and chunked Documents before the long wait
+            del docs, clean_docs
 
-            # ---- Map Step ----
-            chunk_summaries = self._batch_process(chunk_texts, "summary_map")
-
-            # ---- Reduce Step ----
-            combined = "\n\n".join(chunk_summaries)
-            reduced = self._batch_process([combined], "summary_reduce")[0]
+            # ---- Map + Reduce Steps (on the pipeline's event loop) ----
+            reduced, fallbacks = asyncio.run_coroutine_threadsafe(
+                self._amap_reduce(chunk_texts), self._loop
+            ).result()
 
             logger.info("Document analysis completed successfully.")
-            return {"summary": reduced}
+            # fallback_chunks > 0 marks a degraded result (callers should not cache it)
+            return {"summary": reduced, "fallback_chunks": fallbacks}
 
         except Exception as e:
             logger.error(f"Error in DocumentAnalysisPipeline: {e}")
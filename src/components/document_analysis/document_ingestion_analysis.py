@@ -16,6 +16,7 @@ class DocumentAnalysisIngestor:
             input_dir=self.input_dir,
             supported_exts=self.supported_exts,
             loader_map=self.loader_map,
+            max_workers=config.get("ingestion.workers", 8),
         )
 
     def load_documents(self, paths: list[str] | None = None):
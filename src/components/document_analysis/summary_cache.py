@@ -0,0 +1,33 @@
+# src/components/document_analysis/summary_cache.py
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.configuration.config_loader import config
+from src.components.sqlite_store import SQLiteKVStore
+
+
+class SummaryCache(SQLiteKVStore):
+    """
+    Persistent exact-match cache of chunk summaries keyed on blake2b(scope || 0x00 || text).
+    The scope carries the model and prompt template, so editing either invalidates old entries.
+    Repeated chunks (boilerplate, re-uploads) skip the LLM entirely.
+    """
+
+    table = "summaries"
+    value_column = "summary"
+    value_type = "TEXT"
+
+    @staticmethod
+    def scope(model_id: str, template: str) -> str:
+        """Key scope for one model + prompt template pair."""
+        return f"{model_id}\0{template}"
+
+
+def create_summary_cache(cfg: Optional[Dict[str, Any]] = None) -> Optional[SummaryCache]:
+    """Build the chunk summary cache from config; returns None when disabled."""
+    cfg = cfg if cfg is not None else config.get("cache.summaries", {}) or {}
+    if not cfg.get("enabled", True):
+        return None
+    cache_dir = config.get("paths.cache_dir", "cache/")
+    return SummaryCache(Path(cache_dir) / cfg.get("sqlite_file", "summaries.sqlite"))
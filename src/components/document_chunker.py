@@ -30,8 +30,12 @@ class ChunkingUtility:
                 return []
 
             chunks = self.splitter.split_documents(documents)
+            # split_documents gives every chunk its own metadata copy, so update it in place
+            strategy = self.strategy
             for i, chunk in enumerate(chunks):
-                chunk.metadata = {**chunk.metadata, "chunk_id": i, "chunk_strategy": self.strategy}
+                md = chunk.metadata
+                md["chunk_id"] = i
+                md["chunk_strategy"] = strategy
 
             logger.info(f"Chunking complete: {len(chunks)} chunks from {len(documents)} docs for pipeline '{self.pipeline_name}'")
             return chunks
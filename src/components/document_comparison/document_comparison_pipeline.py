@@ -1,8 +1,9 @@
 # src\document_comparison\document_comparison_pipeline.py
 
 from __future__ import annotations
+import hashlib
 from typing import List, Dict, Any, Union
-import argparse
+from itertools import zip_longest
 
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnableSequence
@@ -20,22 +21,15 @@ from src.components.model_loader import ModelFactory
 class DocumentComparisonPipeline:
     """Config-driven pipeline for comparing two sets of documents."""
 
-    def __init__(self):
+    def __init__(self, strategy: str | None = None):
         try:
             # Ingest + preprocess
             self.ingestor = DocumentComparisonIngestor()
             self.preprocessor = ComparisonPreprocessingPipeline()
             self.parser = get_document_comparison_parser()
 
-            # CLI strategy override
-            cli_parser = argparse.ArgumentParser()
-            cli_parser.add_argument(
-                "--strategy",
-                choices=config.get_document_comparison_strategies(),
-                help="Choose document comparison strategy (chunkwise/holistic)",
-            )
-            args, _ = cli_parser.parse_known_args()
-            self.strategy = args.strategy or config.get("document_comparison.default_prompt")
+            # Strategy override (the CLI passes --strategy through main_comparison.py)
+            self.strategy = strategy or config.get("document_comparison.default_prompt")
             logger.info(f"Using comparison strategy: {self.strategy}")
 
             # LLM
@@ -71,6 +65,12 @@ class DocumentComparisonPipeline:
                 )
                 self.chains[step_name] = prompt | self.llm | self.parser
 
+            # Result cache scope: results depend on the model, strategy and prompts, not just the uploads
+            model_id = getattr(self.llm, "model_name", None) or type(self.llm).__name__
+            scope_parts = [model_id, self.strategy]
+            scope_parts += [prompts.get_comparison_prompt(step)["template"] for step in sorted(self.chains)]
+            self.result_cache_scope = hashlib.blake2b("\0".join(scope_parts).encode("utf-8"), digest_size=8).hexdigest()
+
             logger.info(f"DocumentComparisonPipeline initialized with chains: {list(self.chains.keys())}")
 
         except Exception as e:
@@ -87,9 +87,8 @@ class DocumentComparisonPipeline:
 
         # ---- Ingest ----
         if file_paths_a or file_paths_b:
-            # explicit file paths
-            docs_a = self.ingestor.loader_a.load_paths(file_paths_a or [])
-            docs_b = self.ingestor.loader_b.load_paths(file_paths_b or [])
+            # explicit file paths; both sides are queued on the shared loader pool and parse concurrently
+            docs_a, docs_b = self.ingestor.load_paths_pair(file_paths_a or [], file_paths_b or [])
         else:
             # default directories from config
             docs_a, docs_b = self.ingestor.load_documents_pair()
@@ -102,10 +101,11 @@ class DocumentComparisonPipeline:
 
         # ---- Strategy execution ----
         if self.strategy == "holistic_compare":
-            text_a = " ".join([doc.page_content for doc in clean_a]).strip()
-            text_b = " ".join([doc.page_content for doc in clean_b]).strip()
-            if not text_a or not text_b:
+            # Reject empty sides before building the joined texts
+            if not any(doc.page_content.strip() for doc in clean_a) or not any(doc.page_content.strip() for doc in clean_b):
                 raise CustomException("After preprocessing, one or both texts are empty.", ValueError("empty_text"))
+            text_a = " ".join(doc.page_content for doc in clean_a).strip()
+            text_b = " ".join(doc.page_content for doc in clean_b).strip()
 
             result_obj = self.chains["holistic_compare"].invoke({
                 "doc1_text": text_a,
@@ -114,21 +114,21 @@ class DocumentComparisonPipeline:
             return {"strategy": "holistic", "result": result_obj.dict()}
 
         elif self.strategy == "compare_docs":
-            comparisons = []
-            max_len = max(len(clean_a), len(clean_b))
-            for i in range(max_len):
-                chunk_a = clean_a[i].page_content if i < len(clean_a) else ""
-                chunk_b = clean_b[i].page_content if i < len(clean_b) else ""
-                if not chunk_a and not chunk_b:
-                    continue
-                result_obj = self.chains["compare_docs"].invoke({
-                    "doc1_chunk": chunk_a,
-                    "doc2_chunk": chunk_b,
-                })
-                comparisons.append(result_obj.dict())
+            # Pair chunks positionally; the shorter side is padded with empty text
+            inputs = [
+                {"doc1_chunk": chunk_a, "doc2_chunk": chunk_b}
+                for chunk_a, chunk_b in zip_longest(
+                    (doc.page_content for doc in clean_a), (doc.page_content for doc in clean_b), fillvalue=""
+                )
+                if chunk_a or chunk_b
+            ]
+            results = self.chains["compare_docs"].batch(
+                inputs, config={"max_concurrency": config.get("document_comparison.concurrency", 8)}
+            )
+            comparisons = [result_obj.dict() for result_obj in results]
 
             # REDUCE step
-            combined_text = "\n\n".join([str(c) for c in comparisons])
+            combined_text = "\n\n".join(str(c) for c in comparisons)
             reduced_obj = self.chains["chunk_reduce"].invoke({"chunk_comparisons": combined_text})
 
             return {"strategy": "chunkwise", "comparisons": comparisons, "summary": reduced_obj.dict()}
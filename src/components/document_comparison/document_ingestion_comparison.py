@@ -1,7 +1,8 @@
 # src/components/document_ingestion_comparison.py
 
+from concurrent.futures import Future
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Iterable, List, Tuple, Union
 from langchain_core.documents import Document
 from src.configuration.config_loader import config
 from src.common.logging.logger import logger
@@ -25,11 +26,13 @@ class DocumentComparisonIngestor:
             input_dir=self.dir_a,
             supported_exts=self.supported_exts,
             loader_map=self.loader_map,
+            max_workers=config.get("ingestion.workers", 8),
         )
         self.loader_b = CommonDocumentLoader(
             input_dir=self.dir_b,
             supported_exts=self.supported_exts,
             loader_map=self.loader_map,
+            max_workers=config.get("ingestion.workers", 8),
         )
         logger.info(f"DocumentComparisonIngestor initialized with A={self.dir_a}, B={self.dir_b}")
 
@@ -42,38 +45,63 @@ class DocumentComparisonIngestor:
     def load_documents_set_b(self) -> List[Document]:
         return self.loader_b.load_directory()
 
+    def _submit_pair(
+        self, paths_a: Iterable[Union[str, Path]], paths_b: Iterable[Union[str, Path]]
+    ) -> Tuple[List[Future], List[Future]]:
+        """Queue both sides' files on the shared loader pool, so A and B parse concurrently."""
+        return (
+            self.loader_a.submit_files(self.loader_a.expand_paths(paths_a)),
+            self.loader_b.submit_files(self.loader_b.expand_paths(paths_b)),
+        )
+
+    def _gather_pair(self, futures: Tuple[List[Future], List[Future]]) -> Tuple[List[Document], List[Document]]:
+        futures_a, futures_b = futures
+        return self.loader_a.gather_files(futures_a), self.loader_b.gather_files(futures_b)
+
+    def load_paths_pair(
+        self, paths_a: Iterable[Union[str, Path]], paths_b: Iterable[Union[str, Path]]
+    ) -> Tuple[List[Document], List[Document]]:
+        """Load two lists of files/directories, one per side."""
+        return self._gather_pair(self._submit_pair(paths_a, paths_b))
+
     def load_documents_pair(self) -> Tuple[List[Document], List[Document]]:
         """Load both default directories and return as a tuple."""
-        return self.load_documents_set_a(), self.load_documents_set_b()
+        return self.load_paths_pair([self.loader_a.input_dir], [self.loader_b.input_dir])
 
     # --------------------------
     # Load arbitrary pairs
     # --------------------------
+    @staticmethod
+    def _check_pair(
+        path1: Union[str, Path], path2: Union[str, Path], docs: Tuple[List[Document], List[Document]]
+    ) -> Tuple[List[Document], List[Document]]:
+        docs1, docs2 = docs
+        if not docs1 or not docs2:
+            raise CustomException(
+                f"One or both paths did not return any documents. path1={path1}, path2={path2}",
+                ValueError("Empty docs"),
+            )
+        logger.info(f"Loaded {len(docs1)} docs from {path1}, {len(docs2)} docs from {path2}")
+        return docs1, docs2
+
     def load_doc_pair(
         self, path1: Union[str, Path], path2: Union[str, Path]
     ) -> Tuple[List[Document], List[Document]]:
         """Load documents from two arbitrary paths."""
         try:
-            docs1 = self.loader_a.load_paths([path1])
-            docs2 = self.loader_b.load_paths([path2])
-            if not docs1 or not docs2:
-                raise CustomException(
-                    f"One or both paths did not return any documents. path1={path1}, path2={path2}",
-                    ValueError("Empty docs"),
-                )
-            logger.info(f"Loaded {len(docs1)} docs from {path1}, {len(docs2)} docs from {path2}")
-            return docs1, docs2
+            return self._check_pair(path1, path2, self.load_paths_pair([path1], [path2]))
         except Exception as e:
             raise CustomException("Failed to load document pair", e)
 
     def load_multiple_pairs(
         self, pairs: List[Tuple[Union[str, Path], Union[str, Path]]]
     ) -> List[Tuple[List[Document], List[Document]]]:
-        """Load multiple pairs of paths with safe error handling."""
+        """Load multiple pairs of paths with safe error handling; every pair is queued before any is awaited."""
+        queued = [self._submit_pair([p1], [p2]) for p1, p2 in pairs]
         results = []
-        for p1, p2 in pairs:
+        for (p1, p2), futures in zip(pairs, queued):
             try:
-                results.append(self.load_doc_pair(p1, p2))
+                results.append(self._check_pair(p1, p2, self._gather_pair(futures)))
             except Exception as e:
                 logger.error(f"Skipping pair ({p1}, {p2}) due to error: {e}")
         return results
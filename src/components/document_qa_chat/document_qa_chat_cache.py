@@ -0,0 +1,86 @@
+# src/components/document_qa_chat/document_qa_chat_cache.py
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.common.logging.logger import logger
+
+
+class QASemanticCache:
+    """
+    Per-session semantic cache for QA answers.
+
+    Questions are stored as unit-length embeddings, so a dot product is the cosine
+    similarity. A lookup returns the cached answer of the closest question when the
+    similarity reaches the threshold. Verbatim repeats are answered by lookup_exact
+    without embedding the question at all. Both sessions and entries are evicted LRU.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 128, max_sessions: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[int, OrderedDict[str, Tuple[np.ndarray, str]]]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup_exact(self, session: int, question: str) -> Optional[str]:
+        """Return the cached answer for a verbatim repeat of a question, or None."""
+        entries = self._sessions.get(session)
+        if not entries or question not in entries:
+            return None
+        self._sessions.move_to_end(session)
+        entries.move_to_end(question)
+        logger.info(f"Exact-match cache hit for session {session}")
+        return entries[question][1]
+
+    def lookup(self, session: int, vector: Sequence[float]) -> Optional[str]:
+        """Return the cached answer for the most similar question, or None on a miss."""
+        entries = self._sessions.get(session)
+        if not entries:
+            return None
+
+        query = self._normalize(vector)
+        keys: List[str] = list(entries)
+        scores = np.stack([entries[k][0] for k in keys]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        self._sessions.move_to_end(session)
+        entries.move_to_end(keys[best])
+        logger.info(f"Semantic cache hit for session {session} (score={scores[best]:.3f})")
+        return entries[keys[best]][1]
+
+    def add(self, session: int, question: str, vector: Sequence[float], answer: str) -> None:
+        """Store an answered question, evicting the least recently used entries."""
+        entries = self._sessions.setdefault(session, OrderedDict())
+        self._sessions.move_to_end(session)
+        entries[question] = (self._normalize(vector), answer)
+        entries.move_to_end(question)
+
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def clear(self, session: int) -> None:
+        self._sessions.pop(session, None)
+
+
+def create_qa_semantic_cache(cfg: Optional[Dict] = None) -> Optional[QASemanticCache]:
+    """Build the semantic cache from config; returns None when disabled."""
+    cfg = cfg or {}
+    if not cfg.get("enabled", True):
+        return None
+    return QASemanticCache(
+        threshold=cfg.get("similarity_threshold", 0.9),
+        max_entries=cfg.get("max_entries_per_session", 128),
+        max_sessions=cfg.get("max_sessions", 256),
+    )
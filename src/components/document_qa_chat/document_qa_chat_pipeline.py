@@ -1,5 +1,6 @@
 # src/components/document_qa_chat/document_qa_chat_pipeline.py
 
+import asyncio
 from typing import List, Dict, Any, Optional
 from langchain_core.documents import Document
 from langchain_core.language_models import BaseLanguageModel
@@ -15,6 +16,7 @@ from src.common.logging.logger import logger
 from src.common.exception.custom_exception import CustomException
 from src.components.model_loader import ModelFactory
 from src.components.rag_utils import RAGUtils
+from src.components.embedding_cache import CachedEmbeddings, EmbeddingStore, create_embedding_store, with_embedding_cache
 from src.components.document_chunker import ChunkingUtility
 from src.components.document_qa_chat.document_qa_chat_ingestion import DocumentQAChatIngestor
 from src.components.document_qa_chat.document_qa_chat_preprocessing import DocumentQAPreprocessor
@@ -27,7 +29,8 @@ class DocumentQAChatPipeline:
         self,
         llm: Optional[BaseLanguageModel] = None,
         embedding: Optional[Embeddings] = None,
-        retriever: Optional[BaseRetriever] = None
+        retriever: Optional[BaseRetriever] = None,
+        embedding_store: Optional[EmbeddingStore] = None
     ):
         try:
             self.model_factory = ModelFactory()
@@ -41,7 +44,12 @@ class DocumentQAChatPipeline:
             else:
                 logger.warning("LLM has no max_tokens attribute")
 
-            self.embedding = embedding or self.model_factory.load_embedding()
+            self.embedding = with_embedding_cache(
+                embedding or self.model_factory.load_embedding(),
+                store=embedding_store,
+                batch_size=config.get("document_qa_chat.embedding_batch_size", 256),
+                max_concurrency=config.get("document_qa_chat.embedding_max_concurrency", 4),
+            )
             self.rag_utils = RAGUtils()
             
             # Initialize components
@@ -147,27 +155,80 @@ class DocumentQAChatPipeline:
         
         return "\n\n".join(formatted) if formatted else "No relevant information found."
 
+    @staticmethod
+    def _rewrite_inputs(question: str, chat_history: str) -> Optional[Dict[str, str]]:
+        """Inputs for the rewrite prompt, or None when there is no history to resolve the question against."""
+        if not chat_history.strip():
+            return None
+        return {"input": f"Conversation History:\n{chat_history}\n\nUser Query: {question}"}
+
+    @staticmethod
+    def _rewritten(question: str, standalone_question: str) -> str:
+        logger.debug(f"Rewritten question: '{question}' -> '{standalone_question}'")
+        return standalone_question.strip()
+
     def _rewrite_question(self, question: str, chat_history: str = "") -> str:
         """Make question standalone using conversation history."""
         try:
-            if not chat_history.strip():
+            rewrite_inputs = self._rewrite_inputs(question, chat_history)
+            if rewrite_inputs is None:
                 return question
-                
-            # Prepare inputs for the rewrite prompt
-            rewrite_inputs = {
-                "input": f"Conversation History:\n{chat_history}\n\nUser Query: {question}"
-            }
-            
             rewrite_chain = self.rewrite_question_prompt | self.llm | StrOutputParser()
-            standalone_question = rewrite_chain.invoke(rewrite_inputs)
-            
-            logger.debug(f"Rewritten question: '{question}' -> '{standalone_question}'")
-            return standalone_question.strip()
-            
+            return self._rewritten(question, rewrite_chain.invoke(rewrite_inputs))
         except Exception as e:
             logger.warning(f"Failed to rewrite question, using original: {e}")
             return question
 
+    async def _arewrite_question(self, question: str, chat_history: str = "") -> str:
+        """Async twin of _rewrite_question."""
+        try:
+            rewrite_inputs = self._rewrite_inputs(question, chat_history)
+            if rewrite_inputs is None:
+                return question
+            rewrite_chain = self.rewrite_question_prompt | self.llm | StrOutputParser()
+            return self._rewritten(question, await rewrite_chain.ainvoke(rewrite_inputs))
+        except Exception as e:
+            logger.warning(f"Failed to rewrite question, using original: {e}")
+            return question
+
+    def embed_question(self, question: str) -> List[float]:
+        """Embed a question with the pipeline's embedding model (used for semantic caching)."""
+        return self.embedding.embed_query(question)
+
+    def _answer_inputs(self, standalone_question: str, retrieved_docs: List[Document]) -> Dict[str, str]:
+        return {"context": self._safe_format_docs(retrieved_docs), "input": standalone_question}
+
+    @staticmethod
+    def _empty_question_result() -> Dict[str, Any]:
+        return {
+            "answer": "Please provide a question.",
+            "success": False
+        }
+
+    @staticmethod
+    def _query_result(
+        question: str, standalone_question: str, answer: str, retrieved_docs: List[Document]
+    ) -> Dict[str, Any]:
+        logger.info(f"QA query processed: '{question}' -> '{standalone_question}'")
+        return {
+            "answer": answer.strip(),
+            "question": question,
+            "standalone_question": standalone_question,
+            "success": True,
+            "retrieved_docs_count": len(retrieved_docs),
+            "has_context": len(retrieved_docs) > 0
+        }
+
+    @staticmethod
+    def _query_error(question: str, e: Exception) -> Dict[str, Any]:
+        logger.error(f"Failed to process query: '{question}' - {e}")
+        return {
+            "answer": "Sorry, I encountered an error processing your question. Please try again.",
+            "question": question,
+            "success": False,
+            "error": str(e)
+        }
+
     def query(self, question: str, chat_history: str = "") -> Dict[str, Any]:
         """
         Query the document QA chatbot with conversation history support.
@@ -181,48 +242,56 @@ class DocumentQAChatPipeline:
         """
         try:
             if not question.strip():
-                return {
-                    "answer": "Please provide a question.",
-                    "success": False
-                }
-            
-            # Rewrite question if there's chat history
+                return self._empty_question_result()
+
+            # Rewrite the question if there's chat history, then retrieve with the standalone form
             standalone_question = self._rewrite_question(question, chat_history)
-            
-            # Get relevant documents using the standalone question
             retrieved_docs = self.retriever.invoke(standalone_question)
-            
-            # Format context for the answer prompt
-            context_text = self._safe_format_docs(retrieved_docs)
-            
-            # Prepare inputs for the answer prompt
-            answer_inputs = {
-                "context": context_text,
-                "input": standalone_question
-            }
-            
-            # Create and invoke the answer chain
+
             answer_chain = self.answer_using_context_prompt | self.llm | StrOutputParser()
-            answer = answer_chain.invoke(answer_inputs)
-            
-            logger.info(f"QA query processed: '{question}' -> '{standalone_question}'")
-            return {
-                "answer": answer.strip(),
-                "question": question,
-                "standalone_question": standalone_question,
-                "success": True,
-                "retrieved_docs_count": len(retrieved_docs),
-                "has_context": len(retrieved_docs) > 0
-            }
-            
+            answer = answer_chain.invoke(self._answer_inputs(standalone_question, retrieved_docs))
+            return self._query_result(question, standalone_question, answer, retrieved_docs)
+
+        except Exception as e:
+            return self._query_error(question, e)
+
+    async def aquery(self, question: str, chat_history: str = "") -> Dict[str, Any]:
+        """Async twin of query: retrieval and LLM calls are awaited, so many questions can overlap."""
+        try:
+            if not question.strip():
+                return self._empty_question_result()
+
+            standalone_question = await self._arewrite_question(question, chat_history)
+            retrieved_docs = await self.retriever.ainvoke(standalone_question)
+
+            answer_chain = self.answer_using_context_prompt | self.llm | StrOutputParser()
+            answer = await answer_chain.ainvoke(self._answer_inputs(standalone_question, retrieved_docs))
+            return self._query_result(question, standalone_question, answer, retrieved_docs)
+
         except Exception as e:
-            logger.error(f"Failed to process query: '{question}' - {e}")
-            return {
-                "answer": "Sorry, I encountered an error processing your question. Please try again.",
-                "question": question,
-                "success": False,
-                "error": str(e)
-            }
+            return self._query_error(question, e)
+
+    async def aquery_many(self, questions: List[str], chat_history: str = "") -> List[Dict[str, Any]]:
+        """
+        Answer independent questions concurrently, in input order.
+        With the embedding cache on and no chat history, the unique questions are embedded up front
+        as queries (at most the cache's max_concurrency at a time), so each retrieval's query
+        embedding is a cache hit, not a separate request.
+        """
+        if isinstance(self.embedding, CachedEmbeddings) and not chat_history.strip():
+            semaphore = asyncio.Semaphore(self.embedding.max_concurrency)
+
+            async def warm(question: str) -> None:
+                async with semaphore:
+                    await self.embedding.aembed_query(question)
+
+            results = await asyncio.gather(
+                *(warm(q) for q in dict.fromkeys(questions) if q.strip()), return_exceptions=True
+            )
+            failures = [r for r in results if isinstance(r, Exception)]
+            if failures:
+                logger.warning(f"Prefetch failed for {len(failures)} questions, embedding per query: {failures[0]}")
+        return list(await asyncio.gather(*(self.aquery(q, chat_history) for q in questions)))
 
     def ingest_new_documents(self, paths: List[str]) -> None:
         """Ingest new documents and update the retriever."""
@@ -252,7 +321,13 @@ class DocumentQAChatPipeline:
 def create_document_qa_chat_pipeline(
     llm: Optional[BaseLanguageModel] = None,
     embedding: Optional[Embeddings] = None,
-    retriever: Optional[BaseRetriever] = None
+    retriever: Optional[BaseRetriever] = None,
+    embedding_store: Optional[EmbeddingStore] = None
 ) -> DocumentQAChatPipeline:
     """Create a configured Document QA Chat pipeline."""
-    return DocumentQAChatPipeline(llm=llm, embedding=embedding, retriever=retriever)
\ No newline at end of file
+    return DocumentQAChatPipeline(
+        llm=llm,
+        embedding=embedding,
+        retriever=retriever,
+        embedding_store=embedding_store or create_embedding_store(),
+    )
\ No newline at end of file
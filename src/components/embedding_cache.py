@@ -0,0 +1,207 @@
+# src/components/embedding_cache.py
+
+import asyncio
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from src.common.logging.logger import logger
+from src.components.sqlite_store import SQLiteKVStore
+from src.configuration.config_loader import config
+
+
+def _model_id(embedding: Embeddings) -> str:
+    """Best-effort identifier of the underlying model, so cache keys never cross models."""
+    for attr in ("model", "model_name", "repo_id"):
+        value = getattr(embedding, attr, None)
+        if value:
+            return str(value)
+    return type(embedding).__name__
+
+
+class EmbeddingStore(SQLiteKVStore):
+    """
+    Persistent SQLite cache of embedding vectors keyed on blake2b(kind || 0x00 || model || 0x00 || text).
+    Survives restarts, so re-uploading the same document skips the embedding API.
+    """
+
+    table = "embeddings"
+    value_column = "vec"
+
+    @staticmethod
+    def make_key(model_id: str, text: str, kind: str = "doc") -> bytes:
+        """kind is "doc" or "query": asymmetric embedders give the same text different vectors per task."""
+        return SQLiteKVStore.make_key(f"{kind}\0{model_id}", text)
+
+    def encode(self, value: List[float]) -> bytes:
+        return array("f", value).tobytes()
+
+    def decode(self, raw: bytes) -> List[float]:
+        vec = array("f")
+        vec.frombytes(raw)
+        return vec.tolist()
+
+
+def create_embedding_store(cfg: Optional[Dict[str, Any]] = None) -> Optional[EmbeddingStore]:
+    """Build the persistent embedding store from config; returns None when disabled."""
+    cfg = cfg if cfg is not None else config.get("cache.embeddings", {}) or {}
+    if not cfg.get("enabled", True) or cfg.get("backend", "sqlite") != "sqlite":
+        return None
+    cache_dir = config.get("paths.cache_dir", "cache/")
+    return EmbeddingStore(Path(cache_dir) / cfg.get("sqlite_file", "embeddings.sqlite"))
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that memoizes vectors per (model, kind, text) in a bounded LRU,
+    backed by an optional persistent EmbeddingStore.
+    Used for both ingest-time (embed_documents, kind "doc") and query-time (embed_query,
+    kind "query") calls, which never share entries;
+    only texts missing from both tiers are sent to the underlying model, split into
+    provider-sized batches that are dispatched concurrently.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        maxsize: int = 2048,
+        model_id: Optional[str] = None,
+        store: Optional[EmbeddingStore] = None,
+        batch_size: int = 256,
+        max_concurrency: int = 4,
+    ):
+        self.embedding = embedding
+        self.model_id = model_id or _model_id(embedding)
+        self.maxsize = maxsize
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, text: str, kind: str) -> Optional[List[float]]:
+        key = (self.model_id, kind, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _put(self, text: str, vector: List[float], kind: str) -> None:
+        key = (self.model_id, kind, text)
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def find_uncached_texts(self, texts: List[str], kind: str = "doc") -> Tuple[Dict[str, List[float]], List[str]]:
+        """Resolve texts of one kind ("doc"/"query") from memory, then the persistent store; return (hits, unique misses)."""
+        hits: Dict[str, List[float]] = {}
+        pending: List[str] = []
+        for text in dict.fromkeys(texts):
+            vector = self._get(text, kind)
+            if vector is None:
+                pending.append(text)
+            else:
+                hits[text] = vector
+
+        if pending and self.store is not None:
+            keys = {EmbeddingStore.make_key(self.model_id, t, kind): t for t in pending}
+            for key, vector in self.store.get_many(list(keys)).items():
+                hits[keys[key]] = vector
+                self._put(keys[key], vector, kind)
+            pending = [t for t in pending if t not in hits]
+
+        return hits, pending
+
+    def _remember(self, fresh: Dict[str, List[float]], kind: str = "doc") -> None:
+        for text, vector in fresh.items():
+            self._put(text, vector, kind)
+        if self.store is not None:
+            self.store.put_many((EmbeddingStore.make_key(self.model_id, t, kind), v) for t, v in fresh.items())
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    def _embed_misses(self, misses: List[str]) -> Dict[str, List[float]]:
+        """Embed misses in provider-sized batches; batches run concurrently, order is preserved."""
+        misses = sorted(misses, key=len)  # similar-length batches waste less padding on local models
+        batches = self._batches(misses)
+        if len(batches) == 1:
+            results = [self.embedding.embed_documents(batches[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                results = list(pool.map(self.embedding.embed_documents, batches))
+        return dict(zip(misses, chain.from_iterable(results)))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, misses = self.find_uncached_texts(texts)
+
+        if misses:
+            fresh = self._embed_misses(misses)
+            self._remember(fresh)
+            vectors.update(fresh)
+
+        logger.info(f"Embedded {len(texts)} texts ({len(misses)} sent to the model)")
+        return [vectors[t] for t in texts]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, misses = await asyncio.to_thread(self.find_uncached_texts, texts)
+
+        if misses:
+            misses = sorted(misses, key=len)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    return await self.embedding.aembed_documents(batch)
+
+            results = await asyncio.gather(*(run(b) for b in self._batches(misses)))
+            fresh = dict(zip(misses, chain.from_iterable(results)))
+            await asyncio.to_thread(self._remember, fresh)
+            vectors.update(fresh)
+
+        return [vectors[t] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        hits, misses = self.find_uncached_texts([text], "query")
+        if misses:
+            vector = self.embedding.embed_query(text)
+            self._remember({text: vector}, "query")
+            return vector
+        return hits[text]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        hits, misses = await asyncio.to_thread(self.find_uncached_texts, [text], "query")
+        if misses:
+            vector = await self.embedding.aembed_query(text)
+            await asyncio.to_thread(self._remember, {text: vector}, "query")
+            return vector
+        return hits[text]
+
+
+def with_embedding_cache(
+    embedding: Embeddings,
+    store: Optional[EmbeddingStore] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+    batch_size: int = 256,
+    max_concurrency: int = 4,
+) -> Embeddings:
+    """Wrap an embedding model with the configured cache (no-op when disabled)."""
+    cfg = cfg if cfg is not None else config.get("cache.embeddings", {}) or {}
+    if not cfg.get("enabled", True) or isinstance(embedding, CachedEmbeddings):
+        return embedding
+    return CachedEmbeddings(
+        embedding,
+        maxsize=cfg.get("memory_size", 2048),
+        store=store,
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+    )
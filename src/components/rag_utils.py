@@ -56,8 +56,8 @@ class RAGUtils:
                 # FAISS (community) does not take persist_directory in constructor
                 return cls.from_documents(documents=documents, embedding=embedding)
             else:
-                # For other vectorstores, pass supported kwargs
-                valid_keys = {"persist_directory", "collection_name", "index_name"}
+                # For other vectorstores, pass supported kwargs (batch sizes control upsert batching)
+                valid_keys = {"persist_directory", "collection_name", "index_name", "batch_size", "embeddings_chunk_size"}
                 kwargs = {k: v for k, v in vs_cfg.items() if k in valid_keys}
                 return cls.from_documents(documents=documents, embedding=embedding, **kwargs)
 
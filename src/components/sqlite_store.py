@@ -0,0 +1,69 @@
+# src/components/sqlite_store.py
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.common.logging.logger import logger
+
+
+class SQLiteKVStore:
+    """
+    Persistent key/value table in SQLite (WAL mode, one connection guarded by a lock).
+    Keys are 32-byte blake2b digests from make_key; subclasses name the table and value
+    column and override encode/decode for their value type.
+    """
+
+    table = "kv"
+    value_column = "value"
+    value_type = "BLOB"
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                f"(key BLOB PRIMARY KEY, {self.value_column} {self.value_type} NOT NULL)"
+            )
+            self._conn.commit()
+        logger.info(f"{type(self).__name__} initialized at {self.db_path}")
+
+    @staticmethod
+    def make_key(scope: str, text: str) -> bytes:
+        return hashlib.blake2b(scope.encode("utf-8") + b"\0" + text.encode("utf-8"), digest_size=32).digest()
+
+    def encode(self, value: Any) -> Any:
+        return value
+
+    def decode(self, raw: Any) -> Any:
+        return raw
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, Any]:
+        found: Dict[bytes, Any] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, {self.value_column} FROM {self.table} WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, raw in rows:
+                    found[bytes(key)] = self.decode(raw)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, Any]]) -> None:
+        rows = [(key, self.encode(value)) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, {self.value_column}) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
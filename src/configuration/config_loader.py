@@ -42,7 +42,8 @@ class ConfigSchema(BaseModel):
     document_analysis: Dict[str, Any] = Field(default_factory=dict)
     document_qa_chat: Dict[str, Any] = Field(default_factory=dict)
     logging: Dict[str, Any] = Field(default_factory=dict)
-    cache: Dict[str, Any] = Field(default_factory=dict)  
+    cache: Dict[str, Any] = Field(default_factory=dict)
+    ingestion: Dict[str, Any] = Field(default_factory=dict)
 
 # --------------------------
 # Config Loader
@@ -55,6 +56,7 @@ class ConfigLoader:
         self.env_path = Path(env_path)
         self.config_path = Path(config_path)
         self.config: ConfigSchema | None = None
+        self._config_dict: Dict[str, Any] = {}
 
         try:
             self._load_env()
@@ -128,6 +130,8 @@ class ConfigLoader:
 
         try:
             self.config = ConfigSchema(**imported)
+            # Dumped once so get() walks a plain dict instead of re-serializing the schema per lookup
+            self._config_dict = self.config.model_dump()
             logger.info(f"Config validated and loaded successfully [{env}]")
         except ValidationError as ve:
             logger.error(f"Schema validation failed: {ve}")
@@ -147,7 +151,7 @@ class ConfigLoader:
     def get(self, key: str, default: Any = None):
         try:
             parts = key.split(".")
-            val = self.config.dict()
+            val = self._config_dict
             for p in parts:
                 val = val[p]
             return val
@@ -0,0 +1,41 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.components.common_document_loader import CommonDocumentLoader
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "sample.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE plain (id INTEGER, name TEXT, score REAL)")
+    conn.executemany(
+        "INSERT INTO plain VALUES (?, ?, ?)",
+        [(1, "alpha", 1.5), (2, 'has "quotes", commas', 2.25), (3, "multi\nline", 0.1), (4, None, 3.0)],
+    )
+    conn.execute('CREATE TABLE "odd ""table"" name" (clause TEXT, page INTEGER)')
+    conn.executemany('INSERT INTO "odd ""table"" name" VALUES (?, ?)', [("4.1", 7), ("4.2", 8)])
+    conn.execute("CREATE TABLE empty (a TEXT, b TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _pandas_csv(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        quoted = table.replace('"', '""')
+        return pd.read_sql_query(f'SELECT * FROM "{quoted}"', conn).to_csv(index=False)
+    finally:
+        conn.close()
+
+
+def test_load_sqlite_matches_pandas_csv(db_path):
+    docs = CommonDocumentLoader()._load_sqlite(str(db_path), batch_size=2)
+
+    assert [d.metadata["table"] for d in docs] == ["plain", 'odd "table" name', "empty"]
+    for doc in docs:
+        assert doc.page_content == _pandas_csv(db_path, doc.metadata["table"])
+    assert [d.metadata["rows"] for d in docs] == [4, 2, 0]
@@ -0,0 +1,130 @@
+import asyncio
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.components.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic 2-d vectors; records every batch sent to the "model"."""
+
+    model = "fake-model"
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.queries: List[str] = []
+
+    @staticmethod
+    def _vector(text: str) -> List[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(list(texts))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.queries.append(text)
+        return [-x for x in self._vector(text)]  # asymmetric, like task-typed embedders
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(tmp_path / "embeddings.sqlite")
+
+
+def test_store_round_trips_float32_vectors(store):
+    key = EmbeddingStore.make_key("model-a", "clause 4")
+    store.put_many([(key, [0.5, -1.25, 3.0])])
+    assert store.get_many([key]) == {key: [0.5, -1.25, 3.0]}
+
+
+def test_store_keys_are_scoped_by_model(store):
+    store.put_many([(EmbeddingStore.make_key("model-a", "clause 4"), [1.0])])
+    assert store.get_many([EmbeddingStore.make_key("model-b", "clause 4")]) == {}
+
+
+def test_store_lookups_span_parameter_batches(store):
+    keys = [EmbeddingStore.make_key("m", str(i)) for i in range(1200)]
+    store.put_many((k, [float(i)]) for i, k in enumerate(keys))
+    found = store.get_many(keys)
+    assert len(found) == 1200
+    assert found[keys[1100]] == [1100.0]
+
+
+def test_store_persists_across_connections(store, tmp_path):
+    key = EmbeddingStore.make_key("m", "text")
+    store.put_many([(key, [2.0])])
+    assert EmbeddingStore(tmp_path / "embeddings.sqlite").get_many([key]) == {key: [2.0]}
+
+
+def test_embed_documents_preserves_order_and_sends_unique_misses():
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, batch_size=2)
+    texts = ["ccc", "a", "bb", "a", "dddd"]
+
+    assert cached.embed_documents(texts) == [FakeEmbeddings._vector(t) for t in texts]
+    assert sorted(t for b in fake.batches for t in b) == ["a", "bb", "ccc", "dddd"]
+    assert all(len(b) <= 2 for b in fake.batches)
+
+
+def test_find_uncached_texts_splits_hits_and_misses(store):
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, store=store)
+    cached.embed_documents(["a", "bb"])
+
+    hits, misses = cached.find_uncached_texts(["bb", "ccc", "a", "ccc"])
+    assert set(hits) == {"a", "bb"}
+    assert misses == ["ccc"]
+
+
+def test_persistent_store_serves_a_fresh_wrapper(store):
+    CachedEmbeddings(FakeEmbeddings(), store=store).embed_documents(["a", "bb"])
+
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, store=store)
+    assert cached.embed_documents(["bb", "a"]) == [FakeEmbeddings._vector("bb"), FakeEmbeddings._vector("a")]
+    assert fake.batches == []
+
+
+def test_memory_tier_is_lru_bounded():
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, maxsize=2)
+    cached.embed_documents(["a", "bb", "ccc"])
+
+    _, misses = cached.find_uncached_texts(["a", "bb", "ccc"])
+    assert misses == ["a"]
+
+
+def test_embed_query_never_reuses_document_vectors(store):
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, store=store)
+    cached.embed_documents(["clause 4"])
+
+    assert cached.embed_query("clause 4") == [-x for x in FakeEmbeddings._vector("clause 4")]
+    assert fake.queries == ["clause 4"]
+
+
+def test_query_vectors_are_cached_apart_from_documents(store):
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, store=store)
+    query_vector = cached.embed_query("clause 4")
+
+    assert asyncio.run(cached.aembed_query("clause 4")) == query_vector
+    assert fake.queries == ["clause 4"]
+    assert cached.embed_documents(["clause 4"]) == [FakeEmbeddings._vector("clause 4")]
+    assert fake.batches == [["clause 4"]]
+
+
+def test_store_keys_are_scoped_by_kind():
+    assert EmbeddingStore.make_key("m", "t", "doc") != EmbeddingStore.make_key("m", "t", "query")
+
+
+def test_aembed_documents_matches_sync_path():
+    fake = FakeEmbeddings()
+    cached = CachedEmbeddings(fake, batch_size=1)
+    texts = ["bb", "a", "bb"]
+
+    assert asyncio.run(cached.aembed_documents(texts)) == [FakeEmbeddings._vector(t) for t in texts]
+    assert cached.find_uncached_texts(texts)[1] == []
@@ -0,0 +1,35 @@
+import pytest
+
+from src.components.document_analysis.summary_cache import SummaryCache, create_summary_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SummaryCache(tmp_path / "summaries.sqlite")
+
+
+def _key(model_id, template, text):
+    return SummaryCache.make_key(SummaryCache.scope(model_id, template), text)
+
+
+def test_round_trip_for_same_model_and_prompt(cache):
+    key = _key("gpt-x", "Summarize: {text}", "clause 4")
+    cache.put_many([(key, "Covers rent.")])
+    assert cache.get_many([key]) == {key: "Covers rent."}
+
+
+@pytest.mark.parametrize(
+    "model_id, template",
+    [("gpt-y", "Summarize: {text}"), ("gpt-x", "Summarize briefly: {text}")],
+)
+def test_entries_are_scoped_by_model_and_prompt(cache, model_id, template):
+    cache.put_many([(_key("gpt-x", "Summarize: {text}", "clause 4"), "Covers rent.")])
+    assert cache.get_many([_key(model_id, template, "clause 4")]) == {}
+
+
+def test_scope_separator_prevents_collisions():
+    assert _key("ab", "c", "t") != _key("a", "bc", "t")
+
+
+def test_disabled_config_returns_none():
+    assert create_summary_cache({"enabled": False}) is None
@@ -0,0 +1,41 @@
+import pytest
+
+from src.components.document_qa_chat.document_qa_chat_cache import QASemanticCache, create_qa_semantic_cache
+
+
+@pytest.fixture
+def cache():
+    return QASemanticCache(threshold=0.9, max_entries=2, max_sessions=2)
+
+
+def test_lookup_hits_similar_question(cache):
+    cache.add(1, "what does clause 4 say?", [1.0, 0.0], "It covers rent.")
+    assert cache.lookup(1, [0.99, 0.05]) == "It covers rent."
+
+
+def test_lookup_exact_hits_verbatim_repeat_only(cache):
+    cache.add(1, "what does clause 4 say?", [1.0, 0.0], "It covers rent.")
+    assert cache.lookup_exact(1, "what does clause 4 say?") == "It covers rent."
+    assert cache.lookup_exact(1, "what does clause 5 say?") is None
+    assert cache.lookup_exact(2, "what does clause 4 say?") is None
+
+
+def test_lookup_misses_below_threshold_and_other_sessions(cache):
+    cache.add(1, "what does clause 4 say?", [1.0, 0.0], "It covers rent.")
+    assert cache.lookup(1, [0.0, 1.0]) is None
+    assert cache.lookup(2, [1.0, 0.0]) is None
+
+
+def test_entries_and_sessions_are_evicted_lru(cache):
+    cache.add(1, "q1", [1.0, 0.0], "a1")
+    cache.add(1, "q2", [0.0, 1.0], "a2")
+    cache.add(1, "q3", [0.7, 0.7], "a3")
+    assert cache.lookup(1, [1.0, 0.0]) is None  # q1 evicted
+
+    cache.add(2, "q", [1.0, 0.0], "a")
+    cache.add(3, "q", [1.0, 0.0], "a")
+    assert cache.lookup(1, [0.0, 1.0]) is None  # session 1 evicted
+
+
+def test_disabled_config_returns_none():
+    assert create_qa_semantic_cache({"enabled": False}) is None
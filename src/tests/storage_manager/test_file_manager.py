@@ -0,0 +1,31 @@
+from storage_manager.file_manager import (
+    append_conversation_turns,
+    coalesce_conversation_writes,
+    save_analysis_result,
+)
+
+
+def test_appends_for_one_session_fold_into_the_first_job():
+    jobs = [
+        (append_conversation_turns, ("qa", 1, [{"q": "a"}])),
+        (save_analysis_result, ("document_analysis", 1, {"summary": "x"}, ["a.pdf"])),
+        (append_conversation_turns, ("qa", 2, [{"q": "b"}])),
+        (append_conversation_turns, ("qa", 1, [{"q": "c"}, {"q": "d"}])),
+    ]
+
+    assert coalesce_conversation_writes(jobs) == [
+        (append_conversation_turns, ("qa", 1, [{"q": "a"}, {"q": "c"}, {"q": "d"}])),
+        (save_analysis_result, ("document_analysis", 1, {"summary": "x"}, ["a.pdf"])),
+        (append_conversation_turns, ("qa", 2, [{"q": "b"}])),
+    ]
+
+
+def test_queued_turn_lists_are_not_mutated():
+    first = [{"q": "a"}]
+    jobs = [
+        (append_conversation_turns, ("qa", 1, first)),
+        (append_conversation_turns, ("qa", 1, [{"q": "b"}])),
+    ]
+
+    coalesce_conversation_writes(jobs)
+    assert first == [{"q": "a"}]
@@ -0,0 +1,50 @@
+import os
+
+import orjson
+import pytest
+
+from storage_manager.result_cache import ResultCache, create_result_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path, maxsize=2, max_disk_entries=3)
+
+
+def test_put_returns_encoded_bytes_served_by_get(cache):
+    encoded = cache.put("k1", {"summary": "It covers rent.", "pages": [1, 2]})
+    assert orjson.loads(encoded) == {"summary": "It covers rent.", "pages": [1, 2]}
+    assert cache.get("k1") == encoded
+    assert cache.get("missing") is None
+
+
+def test_memory_is_lru_bounded(cache):
+    cache.put("k1", {"v": 1})
+    cache.put("k2", {"v": 2})
+    cache.get("k1")  # k2 becomes least recently used
+    cache.put("k3", {"v": 3})
+    assert list(cache._memory) == ["k1", "k3"]
+
+
+def test_disk_round_trip_survives_restart(cache, tmp_path):
+    encoded = cache.put("k1", {"v": 1})
+    reopened = ResultCache(tmp_path, maxsize=2, max_disk_entries=3)
+    assert reopened.get("k1") == encoded
+    assert "k1" in reopened._memory
+
+
+def test_disk_entries_are_pruned_least_recently_used(cache):
+    for i in range(3):
+        cache.put(f"k{i}", {"v": i})
+        os.utime(cache._path(f"k{i}"), (i, i))
+    cache._memory.clear()
+    cache.get("k0")  # touches k0, so k1 is now the oldest file
+
+    cache.put("k3", {"v": 3})
+    assert sorted(p.name for p in cache.cache_dir.glob("*.json")) == sorted(
+        cache._path(k).name for k in ("k0", "k2", "k3")
+    )
+
+
+def test_disabled_config_returns_none():
+    assert create_result_cache("document_analysis", {"enabled": False}) is None
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from storage_manager import session_manager
+
+
+@pytest.fixture
+def sessions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_manager, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(session_manager, "_session_counters", {})
+    return tmp_path
+
+
+def test_numbering_continues_after_existing_sessions(sessions_dir):
+    for name in ("session_2", "session_7", "session_x", "notes"):
+        (sessions_dir / "qa" / name).mkdir(parents=True)
+
+    assert session_manager.get_next_session_number("qa") == 8
+    assert session_manager.get_next_session_number("qa") == 9
+    assert (sessions_dir / "qa" / "session_9").is_dir()
+
+
+def test_numbers_claimed_elsewhere_are_skipped(sessions_dir):
+    assert session_manager.get_next_session_number("qa") == 1
+    (sessions_dir / "qa" / "session_2").mkdir()  # taken by another worker process
+
+    assert session_manager.get_next_session_number("qa") == 3
+
+
+def test_concurrent_allocations_are_unique(sessions_dir):
+    numbers = []
+
+    def allocate():
+        for _ in range(25):
+            numbers.append(session_manager.get_next_session_number("qa"))
+
+    threads = [threading.Thread(target=allocate) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(numbers) == list(range(1, 101))
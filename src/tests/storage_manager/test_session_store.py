@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from storage_manager.session_store import InMemorySessionStore, get_session_store
+
+
+@pytest.fixture
+def store():
+    return InMemorySessionStore(ttl=60, maxsize=10)
+
+
+def test_get_unknown_client_is_empty(store):
+    assert asyncio.run(store.get("nobody")) == (None, [])
+
+
+def test_append_returns_history_and_get_sees_it(store):
+    async def scenario():
+        await store.append("c1", 3, {"question": "q1"})
+        history = await store.append("c1", 3, {"question": "q2"})
+        return history, await store.get("c1")
+
+    history, (session, stored) = asyncio.run(scenario())
+    assert history == [{"question": "q1"}, {"question": "q2"}]
+    assert session == 3 and stored == history
+
+
+def test_returned_history_is_a_copy(store):
+    async def scenario():
+        await store.set("c1", 1, [{"question": "q1"}])
+        _, history = await store.get("c1")
+        history.append({"question": "mutated"})
+        return await store.get("c1")
+
+    assert asyncio.run(scenario()) == (1, [{"question": "q1"}])
+
+
+def test_pop_clears_the_client(store):
+    async def scenario():
+        await store.set("c1", 2, [{"question": "q1"}])
+        popped = await store.pop("c1")
+        return popped, await store.get("c1")
+
+    assert asyncio.run(scenario()) == ((2, [{"question": "q1"}]), (None, []))
+
+
+def test_entries_expire_after_ttl():
+    store = InMemorySessionStore(ttl=0.05)
+
+    async def scenario():
+        await store.set("c1", 1, [{"question": "q1"}])
+        await asyncio.sleep(0.1)
+        return await store.get("c1")
+
+    assert asyncio.run(scenario()) == (None, [])
+
+
+def test_get_session_store_defaults_to_memory(monkeypatch):
+    monkeypatch.delenv("SESSION_BACKEND", raising=False)
+    assert isinstance(get_session_store(ttl=5), InMemorySessionStore)
@@ -1,94 +1,190 @@
 # storage_manager\file_manager.py
 
+import asyncio
+import hashlib
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 import shutil
-import json
-import uuid
+import orjson
 from fastapi import UploadFile
-import tempfile
 from storage_manager.session_manager import get_next_session_number
+from storage_manager.storage_config import storage
 
 BASE_DIR = Path("sessions")
 BASE_DIR.mkdir(exist_ok=True)
 
+UPLOAD_CHUNK_SIZE = 4 << 20  # 4 MiB per read/write while streaming uploads
+
+# Leading bytes every valid file of these types starts with (.docx is a zip archive)
+_MAGIC_BYTES = {".pdf": b"%PDF", ".docx": b"PK\x03\x04"}
+
+
+class UploadRejected(Exception):
+    """An upload failed size or content validation; status_code is the HTTP status to return."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
 
 # ----------------------------
 # Save Uploaded Files into Session
 # ----------------------------
-def save_uploaded_files(route_name: str, files: List[UploadFile], comparison: bool = False) -> Path:
+def _stream_upload(upload: UploadFile, dest: Path, max_bytes: Optional[int] = None) -> Tuple[Path, str]:
     """
-    Save uploaded files into a new session directory.
-    If comparison=True, split files into doc1/doc2 folders.
+    Copy an upload to disk in UPLOAD_CHUNK_SIZE chunks instead of reading it whole into memory,
+    hashing each chunk on the way through. Returns the path and its blake2b content hash.
+    Raises UploadRejected (and removes the partial file) if the content does not match the
+    file extension or grows past max_bytes.
     """
+    digest = hashlib.blake2b(digest_size=16)
+    magic = _MAGIC_BYTES.get(dest.suffix.lower())
+    written = 0
+    upload.file.seek(0)
+    try:
+        with dest.open("wb") as out:
+            for chunk in iter(lambda: upload.file.read(UPLOAD_CHUNK_SIZE), b""):
+                if written == 0 and magic and not chunk.startswith(magic):
+                    raise UploadRejected(415, f"{upload.filename} is not a valid {dest.suffix} file")
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise UploadRejected(413, f"{upload.filename} exceeds the {max_bytes // (1 << 20)} MB upload limit")
+                digest.update(chunk)
+                out.write(chunk)
+        if written == 0 and magic:
+            raise UploadRejected(415, f"{upload.filename} is empty, not a valid {dest.suffix} file")
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return dest, digest.hexdigest()
+
+
+def _create_session_dir(route_name: str, comparison: bool) -> Path:
+    """Allocate the next session directory (plus doc1/doc2 for comparisons)."""
     session_number = get_next_session_number(route_name)
     session_dir = BASE_DIR / route_name / f"session_{session_number}"
     session_dir.mkdir(parents=True, exist_ok=True)
+    if comparison:
+        (session_dir / "doc1").mkdir(exist_ok=True)
+        (session_dir / "doc2").mkdir(exist_ok=True)
+    return session_dir
+
+
+async def save_uploaded_files(
+    route_name: str,
+    files: Optional[List[UploadFile]] = None,
+    doc1: Optional[List[UploadFile]] = None,
+    doc2: Optional[List[UploadFile]] = None,
+    max_bytes: Optional[int] = None,
+) -> Tuple[Path, Dict[Path, str]]:
+    """
+    Save uploaded files into a new session directory.
+    For comparisons, pass the two sides as doc1/doc2; they are saved into doc1/doc2 folders.
+    Each upload is streamed straight from its spooled file into the session
+    directory; the directory scan/mkdir and every file write run on worker threads.
+    Returns the session directory and a {saved path: content hash} map, so callers
+    never need to re-scan the directory for what was written.
+    If any file fails to save or is rejected (see _stream_upload), the session directory is removed.
+    Raises UploadRejected(400) if one side repeats a filename, since both uploads would write the same path.
+    """
+    comparison = doc1 is not None or doc2 is not None
+    for side in ((doc1, doc2) if comparison else (files,)):
+        duplicates = sorted(name for name, count in Counter(f.filename for f in side or []).items() if count > 1)
+        if duplicates:
+            raise UploadRejected(400, f"Duplicate filenames in one upload: {', '.join(duplicates)}")
+
+    session_dir = await asyncio.to_thread(_create_session_dir, route_name, comparison)
 
     if comparison:
-        half = len(files) // 2
-        files_a, files_b = files[:half], files[half:]
         doc1_dir = session_dir / "doc1"
         doc2_dir = session_dir / "doc2"
-        doc1_dir.mkdir(parents=True, exist_ok=True)
-        doc2_dir.mkdir(parents=True, exist_ok=True)
-        for f in files_a:
-            f_path = Path(tempfile.gettempdir()) / f.filename
-            f.file.seek(0)
-            f_path.write_bytes(f.file.read())
-            shutil.copy2(f_path, doc1_dir / f.filename)
-        for f in files_b:
-            f_path = Path(tempfile.gettempdir()) / f.filename
-            f.file.seek(0)
-            f_path.write_bytes(f.file.read())
-            shutil.copy2(f_path, doc2_dir / f.filename)
+        targets = [(f, doc1_dir) for f in doc1 or []] + [(f, doc2_dir) for f in doc2 or []]
     else:
-        for f in files:
-            f_path = Path(tempfile.gettempdir()) / f.filename
-            f.file.seek(0)
-            f_path.write_bytes(f.file.read())
-            shutil.copy2(f_path, session_dir / f.filename)
+        targets = [(f, session_dir) for f in files or []]
+
+    # Let every write finish before cleaning up, so no thread is still writing into a removed directory
+    saved = await asyncio.gather(
+        *(asyncio.to_thread(_stream_upload, f, d / f.filename, max_bytes) for f, d in targets),
+        return_exceptions=True,
+    )
+    errors = [r for r in saved if isinstance(r, BaseException)]
+    if errors:
+        await asyncio.to_thread(shutil.rmtree, session_dir, True)
+        raise errors[0]
+    return session_dir, dict(saved)
 
-    return session_dir
+
+async def mirror_session_files(paths: Iterable[Path]):
+    """Copy files saved under the sessions dir to the configured storage backend; S3 uploads them in parallel."""
+    await storage.asave_files([(path, path.relative_to(BASE_DIR).as_posix()) for path in paths])
 
 
 # ----------------------------
 # Analysis Storage
 # ----------------------------
 def save_analysis_result(route_name: str, session_number: int, result: Dict[str, Any], uploaded_files: List[str]):
-    session_dir = BASE_DIR / route_name / f"session_{session_number}"
-    session_dir.mkdir(parents=True, exist_ok=True)
-    file_path = session_dir / "analysis_result.json"
-    with file_path.open("w", encoding="utf-8") as f:
-        json.dump({"uploaded_files": uploaded_files, "analysis_result": result}, f, indent=2)
+    storage.save_json(
+        f"{route_name}/session_{session_number}/analysis_result.json",
+        {"uploaded_files": uploaded_files, "analysis_result": result},
+    )
 
 
 # ----------------------------
 # Comparison Storage
 # ----------------------------
 def save_comparison_result(route_name: str, session_number: int, result: Dict[str, Any], doc1_files: List[str], doc2_files: List[str]):
-    session_dir = BASE_DIR / route_name / f"session_{session_number}"
-    session_dir.mkdir(parents=True, exist_ok=True)
-    file_path = session_dir / "comparison_result.json"
-    with file_path.open("w", encoding="utf-8") as f:
-        json.dump({"doc1_files": doc1_files, "doc2_files": doc2_files, "comparison_result": result}, f, indent=2)
+    storage.save_json(
+        f"{route_name}/session_{session_number}/comparison_result.json",
+        {"doc1_files": doc1_files, "doc2_files": doc2_files, "comparison_result": result},
+    )
 
 
 # ----------------------------
 # Conversation Storage
 # ----------------------------
+# Conversations are JSON Lines, one turn per line, so each new turn is an O(1) append
+# instead of a rewrite of the whole history. Sessions saved before this still have a
+# conversations.json array, which load_conversation_file falls back to.
+def conversation_file_path(route_name: str, session_number: int) -> Path:
+    return BASE_DIR / route_name / f"session_{session_number}" / "conversations.jsonl"
+
+
+def append_conversation_turns(route_name: str, session_number: int, turns: List[Dict[str, Any]]):
+    path = conversation_file_path(route_name, session_number)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab") as f:
+        f.write(b"".join(orjson.dumps(turn, option=orjson.OPT_NON_STR_KEYS) + b"\n" for turn in turns))
+
+
+def coalesce_conversation_writes(jobs: List[Tuple[Any, tuple]]) -> List[Tuple[Any, tuple]]:
+    """Fold every queued conversation append for a session into its first one, so a batch writes each file once."""
+    merged, appends = [], {}
+    for save_fn, args in jobs:
+        if save_fn is append_conversation_turns:
+            key = args[:2]  # (route_name, session_number)
+            if key in appends:
+                appends[key].extend(args[2])
+                continue
+            appends[key] = list(args[2])
+            args = (*key, appends[key])
+        merged.append((save_fn, args))
+    return merged
+
+
 def save_conversation_file(route_name: str, session_number: int, conversation: List[Dict[str, Any]]):
-    session_dir = BASE_DIR / route_name / f"session_{session_number}"
-    session_dir.mkdir(parents=True, exist_ok=True)
-    file_path = session_dir / "conversations.json"
-    with file_path.open("w", encoding="utf-8") as f:
-        json.dump(conversation, f, indent=2, ensure_ascii=False)
+    path = conversation_file_path(route_name, session_number)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(b"".join(orjson.dumps(turn, option=orjson.OPT_NON_STR_KEYS) + b"\n" for turn in conversation))
 
 
 def load_conversation_file(route_name: str, session_number: int) -> List[Dict[str, Any]]:
-    session_dir = BASE_DIR / route_name / f"session_{session_number}"
-    file_path = session_dir / "conversations.json"
-    if not file_path.exists():
-        return []
-    with file_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    jsonl_path = conversation_file_path(route_name, session_number)
+    if jsonl_path.exists():
+        with jsonl_path.open("rb") as f:
+            return [orjson.loads(line) for line in f if line.strip()]
+    legacy_path = jsonl_path.with_name("conversations.json")
+    if legacy_path.exists():
+        return orjson.loads(legacy_path.read_bytes())
+    return []
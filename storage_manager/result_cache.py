@@ -0,0 +1,92 @@
+# storage_manager\result_cache.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+from src.common.logging.logger import logger
+from src.configuration.config_loader import config
+
+
+class ResultCache:
+    """
+    Pipeline results keyed by the content hash of the uploaded documents.
+    A bounded in-memory LRU sits in front of one JSON file per key on disk, so hits
+    survive restarts. Disk entries are pruned least-recently-used (by mtime) past max_disk_entries.
+    Entries are kept as encoded JSON bytes: a hit is never parsed, and callers can embed it
+    in a response or stored document with orjson.Fragment instead of re-encoding it.
+    """
+
+    def __init__(self, cache_dir: str | Path, maxsize: int = 128, max_disk_entries: int = 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}.json"
+
+    def _remember(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+
+        path = self._path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)  # mark as recently used for disk eviction
+        except OSError:
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> bytes:
+        """Cache a result; returns its encoded bytes so the caller need not encode it again."""
+        encoded = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        self._remember(key, encoded)
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(encoded)
+            tmp.replace(path)
+            self._prune()
+        except OSError as e:
+            logger.error(f"Failed to persist cached result to {path}: {e}")
+        return encoded
+
+    def _prune(self) -> None:
+        with os.scandir(self.cache_dir) as it:
+            entries = [e for e in it if e.name.endswith(".json")]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for stale in entries[: len(entries) - self.max_disk_entries]:
+            Path(stale.path).unlink(missing_ok=True)
+
+
+def create_result_cache(name: str, cfg: Optional[Dict[str, Any]] = None) -> Optional[ResultCache]:
+    """Build the result cache for one pipeline from config; returns None when disabled."""
+    cfg = cfg if cfg is not None else config.get("cache.results", {}) or {}
+    if not cfg.get("enabled", True):
+        return None
+    return ResultCache(
+        Path(config.get("paths.cache_dir", "cache/")) / "results" / name,
+        maxsize=cfg.get("memory_size", 128),
+        max_disk_entries=cfg.get("max_disk_entries", 1024),
+    )
@@ -1,15 +1,22 @@
 
 # storage_manager\session_manager.py
 
+import os
+import threading
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from pathlib import Path
+from cachetools import TTLCache
 from storage_manager.storage_config import storage
+from storage_manager.session_store import SESSION_TTL_SECONDS
 
 # ----------------------------
 # In-memory caches
 # ----------------------------
-conversation_cache: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}  # Permanent sessions
-temp_conversation_cache: Dict[str, List[Dict[str, Any]]] = {}       # TEMP sessions before END
+# Bounded LRU+TTL caches, so a long-running worker only keeps recently used sessions resident.
+# Saved conversations stay on disk and are reloaded on a miss.
+conversation_cache: TTLCache = TTLCache(maxsize=512, ttl=SESSION_TTL_SECONDS)  # Permanent sessions, keyed by (route_name, session_number)
+temp_conversation_cache: TTLCache = TTLCache(maxsize=10_000, ttl=SESSION_TTL_SECONDS)  # TEMP sessions before END
 
 BASE_DIR = "sessions"
 
@@ -17,26 +24,54 @@ BASE_DIR = "sessions"
 # ----------------------------
 # Session Utilities
 # ----------------------------
-def get_next_session_number(route_name: str) -> int:
-    """Compute the next session number based on existing session folders."""
-    from pathlib import Path
+_session_counters: Dict[str, int] = {}
+_counter_lock = threading.Lock()
 
-    route_dir = Path(BASE_DIR) / route_name
-    route_dir.mkdir(parents=True, exist_ok=True)
 
-    existing_sessions = [
-        d.name for d in route_dir.iterdir() 
-        if d.is_dir() and d.name.startswith("session_")
-    ]
+def _scan_session_numbers(route_dir: Path) -> int:
+    """Highest session number among the existing session folders (0 if none)."""
+    # scandir entries carry the file type from the directory listing, so is_dir() costs no extra stat
+    with os.scandir(route_dir) as it:
+        existing_sessions = [
+            e.name for e in it
+            if e.name.startswith("session_") and e.is_dir(follow_symlinks=False)
+        ]
 
     numbers = []
     for session in existing_sessions:
         try:
-            numbers.append(int(session.split("_")[1]))
-        except (IndexError, ValueError):
+            numbers.append(int(session[len("session_"):]))
+        except ValueError:
             continue
 
-    return max(numbers, default=0) + 1
+    return max(numbers, default=0)
+
+
+def get_next_session_number(route_name: str) -> int:
+    """
+    Compute the next session number for a route and claim it by creating its folder.
+    Folders are scanned only the first time a route is seen; afterwards the number comes
+    from an in-process counter, so allocation touches the disk only for the claim itself. mkdir is atomic, so if another worker process already took
+    a number, the claim fails and the next one is tried. Two workers never share a session.
+    """
+    route_dir = Path(BASE_DIR) / route_name
+
+    with _counter_lock:
+        current = _session_counters.get(route_name)
+        if current is None:
+            route_dir.mkdir(parents=True, exist_ok=True)
+            current = _scan_session_numbers(route_dir)
+
+        number = current + 1
+        while True:
+            try:
+                (route_dir / f"session_{number}").mkdir()
+                break
+            except FileExistsError:
+                number += 1
+
+        _session_counters[route_name] = number
+        return number
 
 
 # ----------------------------
@@ -49,8 +84,6 @@ def add_temp_conversation(
     uploaded_files: Optional[List[str]] = None
 ) -> None:
     """Add a conversation entry to TEMP cache for a client until session ends."""
-    temp_conversation_cache.setdefault(client_id, [])
-
     entry = {
         "timestamp": datetime.utcnow().isoformat(),
         "question": question,
@@ -59,7 +92,9 @@ def add_temp_conversation(
     if uploaded_files:
         entry["uploaded_files"] = uploaded_files
 
-    temp_conversation_cache[client_id].append(entry)
+    history = temp_conversation_cache.get(client_id, [])
+    history.append(entry)
+    temp_conversation_cache[client_id] = history  # re-set to slide the TTL
 
 
 def end_session(route_name: str, client_id: str) -> int:
@@ -76,10 +111,10 @@ def end_session(route_name: str, client_id: str) -> int:
     save_conversation_file(route_name, session_number, temp_conversation_cache[client_id])
 
     # Update permanent in-memory cache
-    conversation_cache.setdefault(route_name, {})[session_number] = temp_conversation_cache[client_id]
+    conversation_cache[(route_name, session_number)] = temp_conversation_cache[client_id]
 
     # Clear TEMP cache
-    temp_conversation_cache[client_id] = []
+    temp_conversation_cache.pop(client_id, None)
 
     return session_number
 
@@ -91,11 +126,12 @@ def get_temp_conversation(client_id: str) -> List[Dict[str, Any]]:
 
 def get_conversations(route_name: str, session_number: int) -> List[Dict[str, Any]]:
     """Retrieve conversation from permanent storage, using in-memory cache if available."""
-    if route_name in conversation_cache and session_number in conversation_cache[route_name]:
-        return conversation_cache[route_name][session_number]
+    history = conversation_cache.get((route_name, session_number))
+    if history is not None:
+        return history
 
     from storage_manager.file_manager import load_conversation_file
 
     history = load_conversation_file(route_name, session_number)
-    conversation_cache.setdefault(route_name, {})[session_number] = history
+    conversation_cache[(route_name, session_number)] = history
     return history
@@ -0,0 +1,102 @@
+# storage_manager\session_store.py
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+from src.common.logging.logger import logger
+
+SESSION_TTL_SECONDS = 3600
+
+History = List[Dict[str, Any]]
+
+
+class InMemorySessionStore:
+    """
+    Per-process store of each client's active QA session number and conversation history.
+    Entries expire after `ttl` seconds without a write. Only correct with a single worker.
+    """
+
+    def __init__(self, ttl: int = SESSION_TTL_SECONDS, maxsize: int = 10_000):
+        self._sessions: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._histories: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+
+    async def get(self, client_id: str) -> Tuple[Optional[int], History]:
+        async with self._lock:
+            return self._sessions.get(client_id), list(self._histories.get(client_id, []))
+
+    async def set(self, client_id: str, session_number: int, history: History) -> None:
+        async with self._lock:
+            self._sessions[client_id] = session_number
+            self._histories[client_id] = list(history)
+
+    async def append(self, client_id: str, session_number: int, entry: Dict[str, Any]) -> History:
+        """Append a turn and slide the TTL of both entries; returns the updated history."""
+        async with self._lock:
+            history = self._histories.get(client_id, [])
+            history.append(entry)
+            self._sessions[client_id] = session_number
+            self._histories[client_id] = history
+            return list(history)
+
+    async def pop(self, client_id: str) -> Tuple[Optional[int], History]:
+        async with self._lock:
+            return self._sessions.pop(client_id, None), self._histories.pop(client_id, [])
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session store shared by every worker process.
+    `kk:sess:{client_id}` holds the session number and `kk:conv:{client_id}` is a list of
+    JSON-encoded turns; both keys expire after `ttl` seconds without a write.
+    """
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL_SECONDS):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+        logger.info(f"RedisSessionStore initialized at {url}")
+
+    @staticmethod
+    def _keys(client_id: str) -> Tuple[str, str]:
+        return f"kk:sess:{client_id}", f"kk:conv:{client_id}"
+
+    async def get(self, client_id: str) -> Tuple[Optional[int], History]:
+        sess_key, conv_key = self._keys(client_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            session, turns = await pipe.get(sess_key).lrange(conv_key, 0, -1).execute()
+        return (int(session) if session is not None else None), [orjson.loads(t) for t in turns]
+
+    async def set(self, client_id: str, session_number: int, history: History) -> None:
+        sess_key, conv_key = self._keys(client_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(sess_key, session_number, ex=self.ttl).delete(conv_key)
+            if history:
+                pipe.rpush(conv_key, *(orjson.dumps(t) for t in history)).expire(conv_key, self.ttl)
+            await pipe.execute()
+
+    async def append(self, client_id: str, session_number: int, entry: Dict[str, Any]) -> History:
+        sess_key, conv_key = self._keys(client_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(conv_key, orjson.dumps(entry)).expire(conv_key, self.ttl)
+            pipe.set(sess_key, session_number, ex=self.ttl).lrange(conv_key, 0, -1)
+            *_, turns = await pipe.execute()
+        return [orjson.loads(t) for t in turns]
+
+    async def pop(self, client_id: str) -> Tuple[Optional[int], History]:
+        sess_key, conv_key = self._keys(client_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            session, turns, _ = await pipe.get(sess_key).lrange(conv_key, 0, -1).delete(sess_key, conv_key).execute()
+        return (int(session) if session is not None else None), [orjson.loads(t) for t in turns]
+
+
+def get_session_store(ttl: int = SESSION_TTL_SECONDS):
+    """Pick the session backend from SESSION_BACKEND ("memory" or "redis")."""
+    if os.getenv("SESSION_BACKEND", "memory") == "redis":
+        return RedisSessionStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl=ttl)
+    return InMemorySessionStore(ttl=ttl)
@@ -1,15 +1,68 @@
 # storage_manager\storage_backend.py
 
+import asyncio
+import gzip
 import os
-import json
+import shutil
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, Tuple
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 from src.common.logging.logger import logger  # optional for proper logging
 
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS  # compact: stored JSON is read by code, not people
+_MULTIPART_CHUNK_SIZE = 8 << 20  # files past this go to S3 as 8 MiB multipart parts
+
+@lru_cache(maxsize=1)
+def get_s3_client(max_pool_connections: int = 64):
+    """
+    Shared S3 client, built on first use rather than at import, so each worker process
+    creates its own (boto3 clients are not fork-safe). Keep-alive connections are pooled
+    and throttling is retried adaptively.
+    """
+    return boto3.client(
+        "s3",
+        region_name=os.getenv("AWS_REGION"),
+        config=Config(
+            max_pool_connections=max_pool_connections,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+            tcp_keepalive=True,
+            s3={"addressing_style": "virtual"},
+        ),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _join_s3_key(prefix: str, key: str) -> str:
+    """Object key for a storage key; session keys repeat across saves and loads, so they are built once."""
+    return f"{prefix}/{key}".replace("\\", "/")
+
+
+def _log_s3_error(action: str, key: str, error: Exception) -> None:
+    """
+    Log a failed S3 call as one structured event carrying the key and S3 error code
+    (e.g. SlowDown), so error bursts can be filtered and counted. Throttling is already
+    retried with backoff by the client's adaptive retry mode before we get here.
+    """
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "Unknown")
+    else:
+        code = type(error).__name__
+    logger.error(f"[S3] {action} failed", s3_key=key, error_code=code, error=str(error))
+
+
 class StorageBackend:
     """Abstract base class for storage backends."""
     def save_json(self, key: str, data: dict):
+        self.save_json_bytes(key, orjson.dumps(data, option=_JSON_OPTIONS))
+
+    def save_json_bytes(self, key: str, body: bytes):
+        """Store an already serialized JSON document, so callers writing to several backends encode it once."""
         raise NotImplementedError
 
     def load_json(self, key: str) -> dict:
@@ -18,6 +71,21 @@ class StorageBackend:
     def save_file(self, src_path: Path, dest_key: str):
         raise NotImplementedError
 
+    def save_files(self, items: Iterable[Tuple[Path, str]]):
+        """Save several (src_path, dest_key) pairs; backends with per-request latency override this."""
+        for src_path, dest_key in items:
+            self.save_file(src_path, dest_key)
+
+    # Async facades: blocking storage I/O runs on worker threads, never on the event loop
+    async def asave_json(self, key: str, data: dict):
+        await asyncio.to_thread(self.save_json, key, data)
+
+    async def aload_json(self, key: str) -> dict:
+        return await asyncio.to_thread(self.load_json, key)
+
+    async def asave_files(self, items: Iterable[Tuple[Path, str]]):
+        await asyncio.to_thread(self.save_files, list(items))
+
 
 class LocalStorage(StorageBackend):
     """Local filesystem storage."""
@@ -28,57 +96,89 @@ class LocalStorage(StorageBackend):
     def _full_path(self, key: str) -> Path:
         return self.base / key
 
-    def save_json(self, key: str, data: dict):
+    def save_json_bytes(self, key: str, body: bytes):
         path = self._full_path(key)
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        path.write_bytes(body)
 
     def load_json(self, key: str) -> dict:
         path = self._full_path(key)
         if not path.exists():
             return {}
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        return orjson.loads(path.read_bytes())
 
     def save_file(self, src_path: Path, dest_key: str):
         dest = self._full_path(dest_key)
+        if dest.exists() and dest.samefile(src_path):
+            return  # already in place (uploads are written straight into the sessions dir)
         dest.parent.mkdir(parents=True, exist_ok=True)
-        dest.write_bytes(src_path.read_bytes())
+        shutil.copyfile(src_path, dest)  # zero-copy sendfile on Linux
 
 
 class S3Storage(StorageBackend):
-    """Amazon S3 storage."""
-    def __init__(self, bucket_name: str, base_prefix: str = "sessions"):
+    """Amazon S3 storage. save_files uploads on a shared thread pool instead of one file at a time."""
+    def __init__(self, bucket_name: str, base_prefix: str = "sessions", upload_concurrency: int = 16):
         self.bucket = bucket_name
         self.prefix = base_prefix.strip("/")
-        self.s3 = boto3.client("s3", region_name=os.getenv("AWS_REGION"))
+        # At least one pooled connection per upload thread, so parallel uploads never wait on the pool
+        self._max_pool_connections = max(64, upload_concurrency)
+        self._upload_pool = ThreadPoolExecutor(max_workers=upload_concurrency, thread_name_prefix="s3-upload")
+        # Bodies are streamed from the open file part by part, never held in memory whole
+        self._transfer_config = TransferConfig(
+            multipart_threshold=_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=_MULTIPART_CHUNK_SIZE,
+            max_concurrency=8,
+            use_threads=True,
+        )
+
+    @property
+    def s3(self):
+        return get_s3_client(self._max_pool_connections)
 
     def _s3_key(self, key: str) -> str:
-        return f"{self.prefix}/{key}".replace("\\", "/")
+        return _join_s3_key(self.prefix, key)
 
-    def save_json(self, key: str, data: dict):
+    def save_json_bytes(self, key: str, body: bytes):
         try:
-            body = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
-            self.s3.put_object(Bucket=self.bucket, Key=self._s3_key(key), Body=body)
+            # JSON results compress several-fold; gzip keeps them readable by any S3/HTTP consumer
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=self._s3_key(key),
+                Body=gzip.compress(body, compresslevel=5),
+                ContentType="application/json",
+                ContentEncoding="gzip",
+            )
         except (BotoCoreError, ClientError) as e:
-            logger.error(f"[S3] Failed to save {key}: {e}")
+            _log_s3_error("save", key, e)
 
     def load_json(self, key: str) -> dict:
         try:
             obj = self.s3.get_object(Bucket=self.bucket, Key=self._s3_key(key))
-            return json.loads(obj["Body"].read())
+            body = obj["Body"].read()
+            if obj.get("ContentEncoding") == "gzip":  # objects written before compression are plain JSON
+                body = gzip.decompress(body)
+            return orjson.loads(body)
         except self.s3.exceptions.NoSuchKey:
             return {}
         except (BotoCoreError, ClientError) as e:
-            logger.error(f"[S3] Failed to load {key}: {e}")
+            _log_s3_error("load", key, e)
             return {}
 
     def save_file(self, src_path: Path, dest_key: str):
         try:
-            self.s3.upload_file(str(src_path), self.bucket, self._s3_key(dest_key))
-        except (BotoCoreError, ClientError) as e:
-            logger.error(f"[S3] Failed to upload {dest_key}: {e}")
+            with src_path.open("rb") as f:
+                self.s3.upload_fileobj(f, self.bucket, self._s3_key(dest_key), Config=self._transfer_config)
+        except (BotoCoreError, ClientError, OSError) as e:
+            _log_s3_error("upload", dest_key, e)
+
+    def save_files(self, items: Iterable[Tuple[Path, str]]):
+        # save_file logs and swallows its own errors, so draining the map just waits for every upload
+        list(self._upload_pool.map(lambda item: self.save_file(*item), items))
+
+    async def asave_files(self, items: Iterable[Tuple[Path, str]]):
+        # Submit every upload to the pool directly rather than parking another thread on save_files
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._upload_pool, self.save_file, *item) for item in items))
 
 
 class CompositeStorage(StorageBackend):
@@ -87,9 +187,9 @@ class CompositeStorage(StorageBackend):
         self.primary = primary
         self.fallback = fallback
 
-    def save_json(self, key: str, data: dict):
-        self.fallback.save_json(key, data)
-        self.primary.save_json(key, data)
+    def save_json_bytes(self, key: str, body: bytes):
+        self.fallback.save_json_bytes(key, body)
+        self.primary.save_json_bytes(key, body)
 
     def load_json(self, key: str) -> dict:
         data = self.primary.load_json(key)
@@ -100,3 +200,12 @@ class CompositeStorage(StorageBackend):
     def save_file(self, src_path: Path, dest_key: str):
         self.fallback.save_file(src_path, dest_key)
         self.primary.save_file(src_path, dest_key)
+
+    def save_files(self, items: Iterable[Tuple[Path, str]]):
+        items = list(items)
+        self.fallback.save_files(items)
+        self.primary.save_files(items)
+
+    async def asave_files(self, items: Iterable[Tuple[Path, str]]):
+        items = list(items)
+        await asyncio.gather(self.fallback.asave_files(items), self.primary.asave_files(items))
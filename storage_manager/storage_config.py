@@ -9,7 +9,7 @@ def get_storage():
 
     if mode == "s3":
         bucket = os.getenv("S3_BUCKET")
-        s3 = S3Storage(bucket_name=bucket)
+        s3 = S3Storage(bucket_name=bucket, upload_concurrency=int(os.getenv("S3_UPLOAD_CONCURRENCY", "16")))
         return CompositeStorage(s3, local)
 
     return local